@@ -1,6 +1,25 @@
 import argparse
+import fnmatch
+import json
+import os
+import re
 import sys
-from .project_manager import ProjectManager
+from contextlib import nullcontext
+from datetime import datetime
+from .project_manager import SORT_KEYS, ProjectManager
+from .query import compile_query
+from .report import PERIODS, build_report, format_duration, parse_day, summarize_durations
+from .multi import VIEWS, discover_projects, load_project_views
+from .picker import is_interactive, pick
+from .watch import ChangeWaiter, diff_rows
+
+
+def iso_day(value: str) -> str:
+    """argparse type for YYYY-MM-DD arguments"""
+    try:
+        return parse_day(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
 
 
 def format_numbered_item(number: int, total_items: int, content: str) -> str:
@@ -12,6 +31,390 @@ def format_numbered_item(number: int, total_items: int, content: str) -> str:
     return f"{spaces}{number}. {content}"
 
 
+def add_list_arguments(list_parser: argparse.ArgumentParser):
+    """Add the task selection flags shared by `list` and `watch`"""
+    list_parser.add_argument('--done', action='store_true', help='Show only completed tasks')
+    list_parser.add_argument('--undone', action='store_true', help='Show only incomplete tasks')
+    list_parser.add_argument('--active', action='store_true', help='Show only active tasks')
+    list_parser.add_argument('--clean', action='store_true', help='Show only clean tasks')
+    list_parser.add_argument('--unclean', action='store_true', help='Show only non-clean tasks')
+    list_parser.add_argument('--all', action='store_true', help='Show all tasks including clean')
+    list_parser.add_argument('--simple', action='store_true', help='Show simplified output')
+    list_parser.add_argument('--where', metavar='EXPR',
+                             help='Show tasks matching a filter expression, e.g. \'completed and depth <= 1 and title ~ "api"\'')
+    list_parser.add_argument('--sort', choices=SORT_KEYS, default='priority',
+                             help='Order of tasks under each parent (default: priority)')
+
+
+def get_list_view(manager: ProjectManager, args: argparse.Namespace) -> tuple[list, str]:
+    """Get the (task, level) rows and title selected by the list flags"""
+    # Determine which tasks to show based on flags
+    if args.where:
+        query = getattr(args, 'query', None) or compile_query(args.where)
+        # Keep the compiled query for later calls (watch re-evaluates it on every change)
+        args.query = query
+        hierarchical_tasks = manager.get_filtered_tasks_hierarchically(query.select(manager), sort=args.sort)
+        title = f"Tasks matching: {args.where}"
+    elif args.done:
+        hierarchical_tasks = manager.get_completed_tasks_hierarchically(sort=args.sort)
+        title = "Completed tasks"
+    elif args.undone:
+        hierarchical_tasks = manager.get_tasks_hierarchically(sort=args.sort)
+        title = "Incomplete tasks"
+    elif args.active:
+        hierarchical_tasks = manager.get_active_tasks_hierarchically(sort=args.sort)
+        title = "Active tasks"
+    elif args.clean:
+        hierarchical_tasks = manager.get_tasks_hierarchically(show_all=True, show_clean=True, sort=args.sort)
+        # Filter to only show clean tasks
+        hierarchical_tasks = [(task, level) for task, level in hierarchical_tasks if task.clean]
+        title = "Clean tasks"
+    elif args.unclean:
+        hierarchical_tasks = manager.get_tasks_hierarchically(show_all=True, sort=args.sort)
+        # Filter to only show non-clean tasks
+        hierarchical_tasks = [(task, level) for task, level in hierarchical_tasks if not task.clean]
+        title = "Non-clean tasks"
+    elif args.all:
+        hierarchical_tasks = manager.get_tasks_hierarchically(show_all=True, show_clean=True, sort=args.sort)
+        title = "All tasks"
+    else:
+        # Default: show all non-clean tasks (same as --unclean)
+        hierarchical_tasks = manager.get_tasks_hierarchically(show_all=True, sort=args.sort)
+        # Filter to only show non-clean tasks
+        hierarchical_tasks = [(task, level) for task, level in hierarchical_tasks if not task.clean]
+        title = "Tasks"
+    
+    return hierarchical_tasks, title
+
+
+def get_empty_list_message(args: argparse.Namespace) -> str:
+    if args.where:
+        return "No tasks match the filter"
+    elif args.done:
+        return "No completed tasks in the project"
+    elif args.undone:
+        return "No incomplete tasks in the project"
+    elif args.active:
+        return "No active tasks in the project"
+    elif args.clean:
+        return "No clean tasks in the project"
+    elif args.unclean:
+        return "No non-clean tasks in the project"
+    return "No tasks in the project"
+
+
+def get_task_status(manager: ProjectManager, task) -> str:
+    return format_status(task, task.id in manager.active_tasks, manager.is_blocked(task.id))
+
+
+def format_status(task, is_active: bool, is_blocked: bool) -> str:
+    """Status symbol: * active, C clean, ✓ completed, B blocked, ◯ open"""
+    if is_active:
+        return "*"
+    elif task.clean:
+        return "C"
+    elif task.completed:
+        return "✓"
+    return "B" if is_blocked else "◯"
+
+
+def print_task_list(manager: ProjectManager, hierarchical_tasks: list, title: str, simple: bool = False):
+    if simple:
+        # Simple format
+        print(f"\n{title}:")
+        print("-" * 50)
+
+        for task, level in hierarchical_tasks:
+            status = get_task_status(manager, task)
+            indent = "  " * level
+
+            # Show creation date instead of ID
+            created_date = task.created_at[:10] if task.created_at else "-"
+            print(f"  {status} {indent}{task.title} [{created_date}]")
+            if task.description:
+                print(f"     {indent}{task.description}")
+    else:
+        # Default: Tabular format with columns
+        print(f"\n{title}:")
+        print("-" * 120)
+
+        # Print header
+        print(f"{'':<2} {'':<1} {'Description':<70} {'Created':<12} {'Completed':<12} {'Cleaned':<12}")
+        print("-" * 120)
+
+        for task, level in hierarchical_tasks:
+            status = get_task_status(manager, task)
+
+            # Format dates
+            created_date = task.created_at[:10] if task.created_at else "-"
+            completed_date = task.completed_at[:10] if task.completed_at else "-"
+            cleaned_date = task.cleaned_at[:10] if task.cleaned_at else "-"
+
+            # Create combined description with title and description
+            indent = "  " * level
+            combined_desc = f"{indent}{task.title}"
+            if task.description:
+                combined_desc += f": {task.description}"
+
+            # Truncate if too long
+            if len(combined_desc) > 70:
+                combined_desc = combined_desc[:67] + "..."
+
+            print(f"{'':<2} {status:<1} {combined_desc:<70} {created_date:<12} {completed_date:<12} {cleaned_date:<12}")
+
+
+def choose_task(manager: ProjectManager, rows: list, title: str, prompt: str, root_option: bool = False) -> tuple:
+    """Ask the user to choose one of the (task, level, selectable) rows
+    
+    Uses the type-to-filter picker on a terminal and a numbered list
+    otherwise. Returns (chosen, task); task is None if the root level
+    option was chosen.
+    """
+    choices = [(task, level) for task, level, selectable in rows if selectable]
+    
+    if is_interactive():
+        labels = [f"{get_task_status(manager, task)} {'  ' * level}{task.title} [{task.id[:8]}]" for task, level in choices]
+        # Only titles are searched (ids with @), not the status, indentation or id suffix
+        titles = [task.title for task, _ in choices]
+        ids = [task.id for task, _ in choices]
+        if root_option:
+            labels.insert(0, "Root level (no parent)")
+            titles.insert(0, labels[0])
+            ids.insert(0, "")
+        
+        choice = pick(labels, title, titles=titles, ids=ids)
+        if choice is None:
+            print("Operation cancelled")
+            return False, None
+        if root_option:
+            return True, choices[choice - 1][0] if choice else None
+        return True, choices[choice][0]
+    
+    print(f"\n{title}" + (" (0 for root level):" if root_option else ":"))
+    print("-" * 50)
+    if root_option:
+        print("0. Root level (no parent)")
+    
+    total = len(choices)
+    number = 0
+    for task, level, selectable in rows:
+        content = f"{get_task_status(manager, task)} {'  ' * level}{task.title} [{task.id[:8]}]"
+        if selectable:
+            number += 1
+            print(format_numbered_item(number, total, content))
+        else:
+            # Context row (e.g. the parent of an active task) that cannot be chosen
+            print(f"{' ' * (len(str(total)) + 2)}{content}")
+    
+    try:
+        choice = int(input(f"\n{prompt}: "))
+    except (ValueError, KeyboardInterrupt, EOFError):
+        print("\nOperation cancelled")
+        return False, None
+    
+    if root_option and choice == 0:
+        return True, None
+    if 1 <= choice <= total:
+        return True, choices[choice - 1][0]
+    print("Invalid selection")
+    return False, None
+
+
+# Commands that accept several tasks: (dry-run verb, result message)
+BULK_COMMANDS = {
+    'done': ("mark as completed", "Task marked as completed"),
+    'undone': ("mark as not completed", "Task marked as not completed"),
+    'clean': ("mark as clean", "Task marked as clean"),
+    'unclean': ("mark as not clean", "Task marked as not clean"),
+    'take': ("activate", "Task activated"),
+    'untake': ("deactivate", "Task deactivated"),
+    'delete': ("delete", "Task deleted"),
+}
+
+
+def add_selection_arguments(command_parser: argparse.ArgumentParser, help_text: str):
+    """Add the task selectors shared by the commands in BULK_COMMANDS"""
+    command_parser.add_argument('name', nargs='*', help=help_text)
+    command_parser.add_argument('--glob', metavar='PATTERN', help='Select tasks whose title matches a glob pattern')
+    command_parser.add_argument('--regex', metavar='PATTERN', help='Select tasks whose title matches a regular expression')
+    command_parser.add_argument('--where', metavar='EXPR', help='Select tasks matching a filter expression (see list --where)')
+    command_parser.add_argument('--stdin', action='store_true', help='Read task names, ids or @id-prefixes from stdin, one per line')
+    command_parser.add_argument('--dry-run', action='store_true', help='Show what would change without saving')
+
+
+def has_selection(args: argparse.Namespace) -> bool:
+    return bool(args.name or args.glob or args.regex or args.where or args.stdin)
+
+
+def select_tasks(manager: ProjectManager, args: argparse.Namespace) -> list:
+    """Resolve every selector into a list of distinct tasks, in selection order"""
+    selected = {}
+    
+    references = list(args.name)
+    if args.stdin:
+        references.extend(line.strip() for line in sys.stdin if line.strip())
+    for reference in references:
+        task = manager.get_task(reference) or manager.find_task(reference)
+        if task:
+            selected.setdefault(task.id, task)
+        else:
+            print(f"Task '{reference}' not found")
+    
+    if args.glob:
+        pattern = args.glob.lower()
+        for task in manager.get_all_tasks():
+            if fnmatch.fnmatchcase(task.title.lower(), pattern):
+                selected.setdefault(task.id, task)
+    
+    if args.regex:
+        pattern = re.compile(args.regex, re.IGNORECASE)
+        for task in manager.get_all_tasks():
+            if pattern.search(task.title):
+                selected.setdefault(task.id, task)
+    
+    if args.where:
+        matching_ids = compile_query(args.where).select(manager)
+        for task in manager.get_all_tasks():
+            if task.id in matching_ids:
+                selected.setdefault(task.id, task)
+    
+    return list(selected.values())
+
+
+def get_skip_reason(manager: ProjectManager, command: str, task) -> str:
+    """Why a selected task cannot take part in the command ("" if it can)"""
+    if command == 'take':
+        if task.completed:
+            return f"Cannot activate completed task: {task.title}"
+        elif task.clean:
+            return f"Cannot activate clean task: {task.title}"
+        elif manager.is_blocked(task.id):
+            blockers = ", ".join(blocker.title for blocker in manager.get_blockers(task.id))
+            return f"Cannot activate blocked task: {task.title} (blocked by: {blockers})"
+    return ""
+
+
+def get_changed_ids(manager: ProjectManager, command: str, task_id: str) -> set:
+    """Ids of the tasks whose state the command would actually change"""
+    if command == 'take':
+        return set() if task_id in manager.active_tasks else {task_id}
+    elif command == 'untake':
+        return {task_id} if task_id in manager.active_tasks else set()
+    
+    # done, undone, clean, unclean and delete also apply to every subtask
+    subtree_ids = manager.get_subtree_ids(task_id)
+    if command == 'done':
+        return {subtree_id for subtree_id in subtree_ids if not manager.tasks[subtree_id].completed}
+    elif command == 'undone':
+        return {subtree_id for subtree_id in subtree_ids if manager.tasks[subtree_id].completed}
+    elif command == 'clean':
+        return {subtree_id for subtree_id in subtree_ids if not manager.tasks[subtree_id].clean}
+    elif command == 'unclean':
+        return {subtree_id for subtree_id in subtree_ids if manager.tasks[subtree_id].clean}
+    return subtree_ids
+
+
+def has_selected_ancestor(manager: ProjectManager, task, selected_ids: set) -> bool:
+    seen = {task.id}
+    parent_id = task.parent_id
+    while parent_id and parent_id in manager.tasks and parent_id not in seen:
+        if parent_id in selected_ids:
+            return True
+        seen.add(parent_id)
+        parent_id = manager.tasks[parent_id].parent_id
+    return False
+
+
+def apply_command(manager: ProjectManager, command: str, task_id: str):
+    if command == 'done':
+        manager.complete_task(task_id)
+    elif command == 'undone':
+        manager.uncomplete_task(task_id)
+    elif command == 'clean':
+        manager.clean_task(task_id)
+    elif command == 'unclean':
+        manager.unclean_task(task_id)
+    elif command == 'take':
+        manager.add_active_task(task_id)
+    elif command == 'untake':
+        manager.remove_active_task(task_id)
+    elif command == 'delete':
+        manager.delete_task(task_id)
+
+
+def apply_to_selection(manager: ProjectManager, args: argparse.Namespace):
+    """Apply a command to every selected task with a single save"""
+    tasks = select_tasks(manager, args)
+    if not tasks:
+        print("No tasks selected")
+        return
+    
+    verb, message = BULK_COMMANDS[args.command]
+    label = tasks[0].title if len(tasks) == 1 else f"{len(tasks)} tasks"
+    affected_ids = set()
+    selected_ids = {task.id for task in tasks}
+    
+    with nullcontext() if args.dry_run else manager.batch(args.command, label):
+        for task in tasks:
+            if task.id not in manager.tasks:
+                # Already deleted together with a selected parent
+                continue
+            if args.command not in ('take', 'untake') and has_selected_ancestor(manager, task, selected_ids):
+                # Covered by the selected ancestor, which applies to its whole subtree
+                continue
+            
+            skip_reason = get_skip_reason(manager, args.command, task)
+            if skip_reason:
+                print(skip_reason)
+                continue
+            
+            changed_ids = get_changed_ids(manager, args.command, task.id)
+            if not changed_ids:
+                print(f"Nothing to {verb}: {task.title}")
+                continue
+            affected_ids.update(changed_ids)
+            
+            if args.dry_run:
+                print(f"Would {verb}: {task.title}")
+            else:
+                apply_command(manager, args.command, task.id)
+                print(f"{message}: {task.title}")
+    
+    if args.dry_run:
+        print(f"\nDry run: {len(affected_ids)} task(s) would be affected, nothing was saved")
+    elif len(tasks) > 1:
+        print(f"\n{len(affected_ids)} task(s) affected")
+
+
+def get_watch_rows(manager: ProjectManager, args: argparse.Namespace) -> dict:
+    """Get the current list view as {task_id: row} for change detection"""
+    hierarchical_tasks, _ = get_list_view(manager, args)
+    return {
+        task.id: {
+            "id": task.id,
+            "title": task.title,
+            "description": task.description,
+            "level": level,
+            "status": get_task_status(manager, task),
+            "created_at": task.created_at,
+            "completed_at": task.completed_at,
+            "cleaned_at": task.cleaned_at
+        }
+        for task, level in hierarchical_tasks
+    }
+
+
+def print_watch_changes(changes: list, ndjson: bool = False):
+    markers = {"added": "+", "removed": "-", "changed": "~"}
+    for event, row in changes:
+        if ndjson:
+            print(json.dumps({"event": event, "task": row}, ensure_ascii=False))
+        else:
+            indent = "  " * row["level"]
+            print(f"{markers[event]} {row['status']} {indent}{row['title']}")
+    sys.stdout.flush()
+
+
 def main():
     manager = ProjectManager()
 
@@ -20,43 +423,76 @@ def main():
 
     subparsers.add_parser('init', help='Initialize a new project')
     list_parser = subparsers.add_parser('list', help='List tasks')
-    list_parser.add_argument('--done', action='store_true', help='Show only completed tasks')
-    list_parser.add_argument('--undone', action='store_true', help='Show only incomplete tasks')
-    list_parser.add_argument('--active', action='store_true', help='Show only active tasks')
-    list_parser.add_argument('--clean', action='store_true', help='Show only clean tasks')
-    list_parser.add_argument('--unclean', action='store_true', help='Show only non-clean tasks')
-    list_parser.add_argument('--all', action='store_true', help='Show all tasks including clean')
-    list_parser.add_argument('--simple', action='store_true', help='Show simplified output')
+    add_list_arguments(list_parser)
     
     task_parser = subparsers.add_parser('task', help='Create or select task')
-    task_parser.add_argument('name', help='Task name')
+    task_parser.add_argument('name', help='Task name (or @id-prefix of an existing task)')
     task_parser.add_argument('-d', '--description', help='Task description', default='')
 
     subparsers.add_parser('active', help='Show active task')
 
+    watch_parser = subparsers.add_parser('watch', help='Keep printing task changes as the project is modified')
+    add_list_arguments(watch_parser)
+    watch_parser.add_argument('--interval', type=float, default=1.0, help='Seconds between change checks (default: 1)')
+    watch_parser.add_argument('--ndjson', action='store_true', help='Print changes as JSON lines')
+
     done_parser = subparsers.add_parser('done', help='Mark task as completed')
-    done_parser.add_argument('name', nargs='?', help='Task name (optional)')
+    add_selection_arguments(done_parser, 'Task names or @id-prefixes (optional)')
 
     delete_parser = subparsers.add_parser('delete', help='Delete task')
-    delete_parser.add_argument('name', nargs='?', help='Task name (optional)')
+    add_selection_arguments(delete_parser, 'Task names or @id-prefixes (optional)')
 
     move_parser = subparsers.add_parser('move', help='Move task to different parent')
-    move_parser.add_argument('name', nargs='?', help='Task name to move (optional)')
+    move_parser.add_argument('name', nargs='?', help='Task name or @id-prefix to move (optional)')
+    move_target = move_parser.add_mutually_exclusive_group()
+    move_target.add_argument('--to', dest='parent', help='New parent task name or @id-prefix')
+    move_target.add_argument('--root', action='store_true', help='Move to root level')
 
     undone_parser = subparsers.add_parser('undone', help='Mark task as not completed')
-    undone_parser.add_argument('name', nargs='?', help='Task name (optional)')
+    add_selection_arguments(undone_parser, 'Task names or @id-prefixes (optional)')
 
     clean_parser = subparsers.add_parser('clean', help='Mark task as clean')
-    clean_parser.add_argument('name', nargs='?', help='Task name (optional)')
+    add_selection_arguments(clean_parser, 'Task names or @id-prefixes (optional)')
 
     unclean_parser = subparsers.add_parser('unclean', help='Mark task as not clean')
-    unclean_parser.add_argument('name', nargs='?', help='Task name (optional)')
+    add_selection_arguments(unclean_parser, 'Task names or @id-prefixes (optional)')
 
     take_parser = subparsers.add_parser('take', help='Activate a task')
-    take_parser.add_argument('name', nargs='?', help='Task name to activate (optional)')
+    add_selection_arguments(take_parser, 'Task names or @id-prefixes to activate (optional)')
 
     untake_parser = subparsers.add_parser('untake', help='Deactivate a task')
-    untake_parser.add_argument('name', nargs='?', help='Task name to deactivate (optional)')
+    add_selection_arguments(untake_parser, 'Task names or @id-prefixes to deactivate (optional)')
+
+    report_parser = subparsers.add_parser('report', help='Show created/completed/cleaned counts and cycle times')
+    report_parser.add_argument('--since', type=iso_day, help='First day to include (YYYY-MM-DD)')
+    report_parser.add_argument('--until', type=iso_day, help='Last day to include (YYYY-MM-DD)')
+    report_parser.add_argument('--by', choices=PERIODS, default='day', help='Group counts by day or week (default: day)')
+
+    time_parser = subparsers.add_parser('time', help='Show time spent on tasks while they were active')
+    time_parser.add_argument('name', nargs='?', help='Task name or @id-prefix: only show this task and its subtasks (optional)')
+    time_parser.add_argument('--since', help='Only count time after this day (YYYY-MM-DD)')
+
+    block_parser = subparsers.add_parser('block', help='Mark a task as blocked by other tasks')
+    block_parser.add_argument('name', help='Task name or @id-prefix')
+    block_parser.add_argument('--on', action='append', required=True, metavar='BLOCKER', help='Blocking task name or @id-prefix (repeatable)')
+
+    unblock_parser = subparsers.add_parser('unblock', help='Remove blockers from a task')
+    unblock_parser.add_argument('name', help='Task name or @id-prefix')
+    unblock_parser.add_argument('--on', action='append', metavar='BLOCKER', help='Blocking task name or @id-prefix (repeatable, default: all)')
+
+    subparsers.add_parser('undo', help='Undo the last change')
+    subparsers.add_parser('redo', help='Redo the last undone change')
+    subparsers.add_parser('history', help='Show changes that can be undone')
+
+    fsck_parser = subparsers.add_parser('fsck', help='Check the project for broken links between tasks')
+    fsck_parser.add_argument('--repair', action='store_true', help='Fix the issues found (can be undone)')
+    fsck_parser.add_argument('--json', action='store_true', help='Print the issues as JSON')
+
+    multi_parser = subparsers.add_parser('multi', help='Query tasks across every project below a directory')
+    multi_parser.add_argument('view', choices=VIEWS, help='Tasks to show: list, active or next (open leaf tasks)')
+    multi_parser.add_argument('--root', default='.', help='Directory to search for projects (default: current)')
+    multi_parser.add_argument('--max-depth', type=int, default=4, help='Maximum directory depth to search (default: 4)')
+    multi_parser.add_argument('--refresh', action='store_true', help='Ignore the cached project index')
 
     args = parser.parse_args()
 
@@ -70,412 +506,382 @@ def main():
             print(f"Project initialized in {manager.config_file}")
             return
         
+        if args.command == 'multi':
+            project_paths = discover_projects(args.root, args.max_depth, args.refresh)
+            if not project_paths:
+                print(f"No projects found in {args.root}")
+                return
+            
+            titles = {"list": "Tasks", "active": "Active tasks", "next": "Next tasks"}
+            print(f"\n{titles[args.view]} ({len(project_paths)} projects):")
+            print("-" * 80)
+            
+            # Label rows with the path below --root: directory names alone can repeat (a/sub, b/sub)
+            root = os.path.realpath(os.path.expanduser(args.root))
+            labels = {project_path: os.path.relpath(project_path, root) for project_path in project_paths}
+            width = max(24, max(len(label) for label in labels.values()))
+            
+            found = False
+            for project_path, hierarchical_tasks, error in load_project_views(project_paths, args.view):
+                project_name = labels[project_path]
+                if error:
+                    print(f"  {project_name:<{width}} Error: {error}")
+                    continue
+                
+                for task, level, is_active, is_blocked in hierarchical_tasks:
+                    status = format_status(task, is_active, is_blocked)
+                    indent = "  " * level
+                    print(f"  {project_name:<{width}} {status} {indent}{task.title}")
+                    found = True
+            
+            if not found:
+                print("No matching tasks in any project")
+            return
+        
         # For other commands, load existing project
         manager.load_project()
         
         if args.command == 'list':
-            # Determine which tasks to show based on flags
-            if args.done:
-                hierarchical_tasks = manager.get_completed_tasks_hierarchically()
-                title = "Completed tasks"
-            elif args.undone:
-                hierarchical_tasks = manager.get_tasks_hierarchically()
-                title = "Incomplete tasks"
-            elif args.active:
-                hierarchical_tasks = manager.get_active_tasks_hierarchically()
-                title = "Active tasks"
-            elif args.clean:
-                hierarchical_tasks = manager.get_tasks_hierarchically(show_all=True, show_clean=True)
-                # Filter to only show clean tasks
-                hierarchical_tasks = [(task, level) for task, level in hierarchical_tasks if task.clean]
-                title = "Clean tasks"
-            elif args.unclean:
-                hierarchical_tasks = manager.get_tasks_hierarchically(show_all=True)
-                # Filter to only show non-clean tasks
-                hierarchical_tasks = [(task, level) for task, level in hierarchical_tasks if not task.clean]
-                title = "Non-clean tasks"
-            elif args.all:
-                hierarchical_tasks = manager.get_tasks_hierarchically(show_all=True, show_clean=True)
-                title = "All tasks"
-            else:
-                # Default: show all non-clean tasks (same as --unclean)
-                hierarchical_tasks = manager.get_tasks_hierarchically(show_all=True)
-                # Filter to only show non-clean tasks
-                hierarchical_tasks = [(task, level) for task, level in hierarchical_tasks if not task.clean]
-                title = "Tasks"
+            hierarchical_tasks, title = get_list_view(manager, args)
             
             if not hierarchical_tasks:
-                if args.done:
-                    print("No completed tasks in the project")
-                elif args.undone:
-                    print("No incomplete tasks in the project")
-                elif args.active:
-                    print("No active tasks in the project")
-                elif args.clean:
-                    print("No clean tasks in the project")
-                elif args.unclean:
-                    print("No non-clean tasks in the project")
-                else:
-                    print("No tasks in the project")
+                print(get_empty_list_message(args))
                 return
 
-            if args.simple:
-                # Simple format
-                print(f"\n{title}:")
-                print("-" * 50)
-                
-                for task, level in hierarchical_tasks:
-                    if task.id in manager.active_tasks:
-                        status = "*"
-                    elif task.clean:
-                        status = "C"
-                    else:
-                        status = "✓" if task.completed else "◯"
-                    indent = "  " * level
-                    
-                    # Show creation date instead of ID
-                    created_date = task.created_at[:10] if task.created_at else "-"
-                    print(f"  {status} {indent}{task.title} [{created_date}]")
-                    if task.description:
-                        print(f"     {indent}{task.description}")
+            print_task_list(manager, hierarchical_tasks, title, args.simple)
+
+        elif args.command == 'watch':
+            rows = get_watch_rows(manager, args)
+            if args.ndjson:
+                print_watch_changes([("added", row) for row in rows.values()], ndjson=True)
             else:
-                # Default: Tabular format with columns
-                print(f"\n{title}:")
-                print("-" * 120)
-                
-                # Print header
-                print(f"{'':<2} {'':<1} {'Description':<70} {'Created':<12} {'Completed':<12} {'Cleaned':<12}")
-                print("-" * 120)
-                
-                for task, level in hierarchical_tasks:
-                    if task.id in manager.active_tasks:
-                        status = "*"
-                    elif task.clean:
-                        status = "C"
-                    else:
-                        status = "✓" if task.completed else "◯"
-                    
-                    # Format dates
-                    created_date = task.created_at[:10] if task.created_at else "-"
-                    completed_date = task.completed_at[:10] if task.completed_at else "-"
-                    cleaned_date = task.cleaned_at[:10] if task.cleaned_at else "-"
-                    
-                    # Create combined description with title and description
-                    indent = "  " * level
-                    combined_desc = f"{indent}{task.title}"
-                    if task.description:
-                        combined_desc += f": {task.description}"
-                    
-                    # Truncate if too long
-                    if len(combined_desc) > 70:
-                        combined_desc = combined_desc[:67] + "..."
+                hierarchical_tasks, title = get_list_view(manager, args)
+                if hierarchical_tasks:
+                    print_task_list(manager, hierarchical_tasks, title, args.simple)
+                else:
+                    print(get_empty_list_message(args))
+                print("\nWatching for changes (Ctrl+C to stop)...")
+                sys.stdout.flush()
+            
+            waiter = ChangeWaiter(manager.config_dir)
+            try:
+                while True:
+                    waiter.wait(args.interval)
+                    if not manager.reload_if_changed():
+                        continue
                     
-                    print(f"{'':<2} {status:<1} {combined_desc:<70} {created_date:<12} {completed_date:<12} {cleaned_date:<12}")
+                    new_rows = get_watch_rows(manager, args)
+                    print_watch_changes(diff_rows(rows, new_rows), args.ndjson)
+                    rows = new_rows
+            except KeyboardInterrupt:
+                pass
+            finally:
+                waiter.close()
 
         elif args.command == 'task':
-            existing_task = manager.find_task_by_name(args.name)
+            existing_task = manager.find_task(args.name)
             
             if existing_task:
                 manager.add_active_task(existing_task.id)
                 print(f"Task activated: {existing_task.title}")
+            elif args.name.startswith("@"):
+                print(f"Task '{args.name}' not found")
             else:
                 hierarchical_tasks = manager.get_tasks_hierarchically()
+                rows = [(task, level, True) for task, level in hierarchical_tasks]
+                chosen, parent_task = choose_task(manager, rows, "Select parent task", "Select the parent task number", root_option=True)
                 
-                print("\nSelect parent task (0 for root level):")
-                print("-" * 50)
-                print("0. Root level (no parent)")
-                
-                for i, (task, level) in enumerate(hierarchical_tasks, 1):
-                    if task.id in manager.active_tasks:
-                        status = "*"
+                if chosen and parent_task:
+                    manager.create_task(args.name, args.description, parent_task.id)
+                    print(f"Subtask created: {args.name} (of {parent_task.title})")
+                elif chosen:
+                    # Create root task
+                    manager.create_task(args.name, args.description)
+                    print(f"Task created: {args.name}")
+
+        elif args.command == 'report':
+            report = build_report(manager, args.since, args.until, args.by)
+            if not report["periods"]:
+                print("No activity in the selected period")
+                return
+            
+            period_range = f"{args.since or 'start'} to {args.until or 'now'}"
+            print(f"\nActivity from {period_range} (by {args.by}):")
+            print("-" * 50)
+            print(f"{'Period':<14} {'Created':>10} {'Completed':>10} {'Cleaned':>10}")
+            print("-" * 50)
+            for period, counts in report["periods"]:
+                print(f"{period:<14} {counts['created_at']:>10} {counts['completed_at']:>10} {counts['cleaned_at']:>10}")
+            print("-" * 50)
+            totals = report["totals"]
+            print(f"{'Total':<14} {totals['created_at']:>10} {totals['completed_at']:>10} {totals['cleaned_at']:>10}")
+            
+            if report["cycle_times"]:
+                print("\nCycle time by subtree (creation to completion):")
+                print("-" * 70)
+                print(f"{'Subtree':<40} {'Completed':>9} {'Average':>9} {'Median':>9}")
+                print("-" * 70)
+                for root_task, durations in report["cycle_times"]:
+                    count, average, middle = summarize_durations(durations)
+                    subtree_title = root_task.title if len(root_task.title) <= 40 else root_task.title[:37] + "..."
+                    print(f"{subtree_title:<40} {count:>9} {format_duration(average):>9} {format_duration(middle):>9}")
+
+        elif args.command == 'time':
+            task_id = None
+            if args.name:
+                task = manager.find_task(args.name)
+                if not task:
+                    print(f"Task '{args.name}' not found")
+                    return
+                task_id = task.id
+            
+            since = int(datetime.fromisoformat(args.since).timestamp()) if args.since else None
+            time_rows = manager.get_time_report(task_id, since)
+            if not time_rows:
+                print("No time tracked yet. Time is recorded while tasks are taken")
+                return
+            
+            print("\nTime tracked" + (f" since {args.since}" if args.since else "") + ":")
+            print("-" * 70)
+            print(f"{'Own':>8} {'Total':>8}  Task")
+            print("-" * 70)
+            for task, level, own_seconds, subtree_seconds in time_rows:
+                own = format_duration(own_seconds) if own_seconds else "-"
+                indent = "  " * level
+                print(f"{own:>8} {format_duration(subtree_seconds):>8}  {indent}{task.title}")
+
+        elif args.command == 'block':
+            task = manager.find_task(args.name)
+            if not task:
+                print(f"Task '{args.name}' not found")
+                return
+            
+            for blocker_name in args.on:
+                blocker = manager.find_task(blocker_name)
+                if blocker:
+                    manager.add_dependency(task.id, blocker.id)
+                    print(f"Task blocked: {task.title} (by {blocker.title})")
+                else:
+                    print(f"Task '{blocker_name}' not found")
+
+        elif args.command == 'unblock':
+            task = manager.find_task(args.name)
+            if not task:
+                print(f"Task '{args.name}' not found")
+                return
+            
+            if args.on:
+                blockers = []
+                for blocker_name in args.on:
+                    blocker = manager.find_task(blocker_name)
+                    if blocker:
+                        blockers.append(blocker)
                     else:
-                        status = "✓" if task.completed else "◯"
-                    indent = "  " * level
-                    content = f"{status} {indent}{task.title} [{task.id[:8]}]"
-                    print(format_numbered_item(i, len(hierarchical_tasks), content))
+                        print(f"Task '{blocker_name}' not found")
+            else:
+                blockers = [manager.tasks[blocker_id] for blocker_id in task.blocked_by if blocker_id in manager.tasks]
+            
+            for blocker in blockers:
+                manager.remove_dependency(task.id, blocker.id)
+                print(f"Task unblocked: {task.title} (from {blocker.title})")
+
+        elif args.command == 'undo':
+            entry = manager.undo()
+            if entry:
+                print(f"Undone: {entry['command']} {entry['label']}")
+            else:
+                print("Nothing to undo")
+
+        elif args.command == 'redo':
+            entry = manager.redo()
+            if entry:
+                print(f"Redone: {entry['command']} {entry['label']}")
+            else:
+                print("Nothing to redo")
+
+        elif args.command == 'history':
+            history = manager.load_history()
+            if not history["undo"] and not history["redo"]:
+                print("No changes recorded")
+                return
+
+            print("\nHistory (newest first):")
+            print("-" * 80)
+            for entry in reversed(history["undo"]):
+                changed_at = entry["at"][:16].replace("T", " ")
+                affected = f" ({len(entry['before'])} tasks)" if entry["before"] else ""
+                print(f"  {changed_at}  {entry['command']:<8} {entry['label']}{affected}")
+            if history["redo"]:
+                print(f"\n{len(history['redo'])} undone change(s) can be redone")
+
+        elif args.command == 'fsck':
+            issues = manager.check_integrity(repair=args.repair)
+            repaired = bool(issues) and args.repair
+            if args.json:
+                print(json.dumps({"issues": issues, "repaired": repaired}, indent=2, ensure_ascii=False))
+            elif not issues:
+                print("No issues found")
+            else:
+                for issue in issues:
+                    print(f"{issue['type']:<18} {issue['task_id']}  {issue['detail']}")
+                if repaired:
+                    print(f"\nRepaired {len(issues)} issue(s)")
+                else:
+                    print(f"\n{len(issues)} issue(s) found, run 'planit fsck --repair' to fix them")
+            if issues and not repaired:
+                sys.exit(1)
+
+        elif args.command == 'delete':
+            if has_selection(args):
+                apply_to_selection(manager, args)
+            else:
+                hierarchical_tasks = manager.get_tasks_hierarchically(show_all=True, show_clean=True)
                 
-                try:
-                    choice = input("\nSelect the parent task number: ")
-                    parent_index = int(choice)
-                    
-                    if parent_index == 0:
-                        # Create root task
-                        task_id = manager.create_task(args.name, args.description)
-                        print(f"Task created: {args.name}")
-                    elif 1 <= parent_index <= len(hierarchical_tasks):
-                        parent_task, _ = hierarchical_tasks[parent_index - 1]
-                        task_id = manager.create_task(args.name, args.description, parent_task.id)
-                        print(f"Subtask created: {args.name} (of {parent_task.title})")
-                    else:
-                        print("Invalid selection")
-                except (ValueError, KeyboardInterrupt):
-                    print("\nOperation cancelled")
+                if not hierarchical_tasks:
+                    print("No tasks in the project")
+                    return
 
-        elif args.command == 'unclean':
+                rows = [(task, level, True) for task, level in hierarchical_tasks]
+                chosen, task = choose_task(manager, rows, "Available tasks to delete", "Select the task number to delete")
+                if chosen:
+                    manager.delete_task(task.id)
+                    print(f"Task deleted: {task.title}")
+
+        elif args.command == 'move':
+            hierarchical_tasks = manager.get_tasks_hierarchically(show_all=True)
+            
             if args.name:
-                task = manager.find_task_by_name(args.name)
-                if task:
-                    manager.unclean_task(task.id)
-                    print(f"Task marked as not clean: {task.title}")
-                else:
+                task = manager.find_task(args.name)
+                if not task:
                     print(f"Task '{args.name}' not found")
+                    return
+            else:
+                if not hierarchical_tasks:
+                    print("No tasks in the project")
+                    return
+
+                rows = [(candidate, level, True) for candidate, level in hierarchical_tasks]
+                chosen, task = choose_task(manager, rows, "Available tasks to move", "Select the task number to move")
+                if not chosen:
+                    return
+            
+            if args.root:
+                parent_task = None
+            elif args.parent:
+                parent_task = manager.find_task(args.parent)
+                if not parent_task:
+                    print(f"Task '{args.parent}' not found")
+                    return
+            else:
+                # A task cannot be moved below itself or its descendants
+                subtree_ids = manager.get_subtree_ids(task.id)
+                rows = [(candidate, level, candidate.id not in subtree_ids) for candidate, level in hierarchical_tasks]
+                chosen, parent_task = choose_task(manager, rows, f"Select new parent for {task.title}", "Select the parent task number", root_option=True)
+                if not chosen:
+                    return
+            
+            manager.move_task(task.id, parent_task.id if parent_task else None)
+            if parent_task:
+                print(f"Task moved: {task.title} (to {parent_task.title})")
+            else:
+                print(f"Task moved: {task.title} (to root level)")
+
+        elif args.command == 'unclean':
+            if has_selection(args):
+                apply_to_selection(manager, args)
             else:
                 # Show only clean tasks to mark them as unclean
                 hierarchical_tasks = manager.get_tasks_hierarchically(show_all=True, show_clean=True)
-                clean_tasks = [(task, level) for task, level in hierarchical_tasks if task.clean]
+                rows = [(task, level, True) for task, level in hierarchical_tasks if task.clean]
                 
-                if not clean_tasks:
+                if not rows:
                     print("No clean tasks in the project")
                     return
 
-                print("\nAvailable tasks to mark as not clean:")
-                print("-" * 50)
-                
-                for i, (task, level) in enumerate(clean_tasks, 1):
-                    if task.id in manager.active_tasks:
-                        status = "*"
-                    else:
-                        status = "✓" if task.completed else "◯"
-                    indent = "  " * level
-                    content = f"{status} {indent}{task.title} [{task.id[:8]}]"
-                    print(format_numbered_item(i, len(clean_tasks), content))
-                
-                try:
-                    choice = input("\nSelect the task number to mark as not clean: ")
-                    task_index = int(choice) - 1
-                    
-                    if 0 <= task_index < len(clean_tasks):
-                        task, _ = clean_tasks[task_index]
-                        manager.unclean_task(task.id)
-                        print(f"Task marked as not clean: {task.title}")
-                    else:
-                        print("Invalid selection")
-                except (ValueError, KeyboardInterrupt):
-                    print("\nOperation cancelled")
+                chosen, task = choose_task(manager, rows, "Available tasks to mark as not clean", "Select the task number to mark as not clean")
+                if chosen:
+                    manager.unclean_task(task.id)
+                    print(f"Task marked as not clean: {task.title}")
 
         elif args.command == 'clean':
-            if args.name:
-                task = manager.find_task_by_name(args.name)
-                if task:
-                    manager.clean_task(task.id)
-                    print(f"Task marked as clean: {task.title}")
-                else:
-                    print(f"Task '{args.name}' not found")
+            if has_selection(args):
+                apply_to_selection(manager, args)
             else:
                 # Show only unclean tasks to mark them as clean
                 hierarchical_tasks = manager.get_tasks_hierarchically(show_all=True)
-                unclean_tasks = [(task, level) for task, level in hierarchical_tasks if not task.clean]
+                rows = [(task, level, True) for task, level in hierarchical_tasks if not task.clean]
                 
-                if not unclean_tasks:
+                if not rows:
                     print("No unclean tasks in the project")
                     return
 
-                print("\nAvailable tasks to mark as clean:")
-                print("-" * 50)
-                
-                for i, (task, level) in enumerate(unclean_tasks, 1):
-                    if task.id in manager.active_tasks:
-                        status = "*"
-                    else:
-                        status = "✓" if task.completed else "◯"
-                    indent = "  " * level
-                    content = f"{status} {indent}{task.title} [{task.id[:8]}]"
-                    print(format_numbered_item(i, len(unclean_tasks), content))
-                
-                try:
-                    choice = input("\nSelect the task number to mark as clean: ")
-                    task_index = int(choice) - 1
-                    
-                    if 0 <= task_index < len(unclean_tasks):
-                        task, _ = unclean_tasks[task_index]
-                        manager.clean_task(task.id)
-                        print(f"Task marked as clean: {task.title}")
-                    else:
-                        print("Invalid selection")
-                except (ValueError, KeyboardInterrupt):
-                    print("\nOperation cancelled")
+                chosen, task = choose_task(manager, rows, "Available tasks to mark as clean", "Select the task number to mark as clean")
+                if chosen:
+                    manager.clean_task(task.id)
+                    print(f"Task marked as clean: {task.title}")
 
         elif args.command == 'take':
-            if args.name:
-                task = manager.find_task_by_name(args.name)
-                if task:
-                    if task.completed:
-                        print(f"Cannot activate completed task: {task.title}")
-                    elif task.clean:
-                        print(f"Cannot activate clean task: {task.title}")
-                    else:
-                        manager.add_active_task(task.id)
-                        print(f"Task activated: {task.title}")
-                else:
-                    print(f"Task '{args.name}' not found")
+            if has_selection(args):
+                apply_to_selection(manager, args)
             else:
-                takeable_tasks = manager.get_takeable_tasks_hierarchically()
-                if not any(can_take for _, _, can_take in takeable_tasks):
-                    print("No tasks available to activate")
+                # Tasks that can't be taken are not shown
+                takeable_tasks = [row for row in manager.get_takeable_tasks_hierarchically() if row[2]]
+                if not takeable_tasks:
+                    print("No unblocked tasks available to activate")
                     return
 
-                print("\nAvailable tasks to activate:")
-                print("-" * 50)
-                
-                selectable_tasks = []
-                counter = 1
-                
-                for task, level, can_take in takeable_tasks:
-                    if can_take:
-                        status = "✓" if task.completed else "◯"
-                        indent = "  " * level
-                        content = f"{status} {indent}{task.title} [{task.id[:8]}]"
-                        print(format_numbered_item(counter, len([t for t in takeable_tasks if t[2]]), content))
-                        selectable_tasks.append(task)
-                        counter += 1
-                    else:
-                        # Don't show tasks that can't be taken
-                        pass
-                
-                try:
-                    choice = input("\nSelect the task number to activate: ")
-                    task_index = int(choice) - 1
-                    
-                    if 0 <= task_index < len(selectable_tasks):
-                        task = selectable_tasks[task_index]
-                        manager.add_active_task(task.id)
-                        print(f"Task activated: {task.title}")
-                    else:
-                        print("Invalid selection")
-                except (ValueError, KeyboardInterrupt):
-                    print("\nOperation cancelled")
+                chosen, task = choose_task(manager, takeable_tasks, "Available tasks to activate", "Select the task number to activate")
+                if chosen:
+                    manager.add_active_task(task.id)
+                    print(f"Task activated: {task.title}")
 
         elif args.command == 'untake':
-            if args.name:
-                task = manager.find_task_by_name(args.name)
-                if task:
-                    manager.remove_active_task(task.id)
-                    print(f"Task deactivated: {task.title}")
-                else:
-                    print(f"Task '{args.name}' not found")
+            if has_selection(args):
+                apply_to_selection(manager, args)
             else:
                 untakeable_tasks = manager.get_untakeable_tasks_hierarchically()
                 if not any(can_untake for _, _, can_untake in untakeable_tasks):
                     print("No tasks available to deactivate")
                     return
 
-                print("\nAvailable tasks to deactivate:")
-                print("-" * 50)
-                
-                selectable_tasks = []
-                counter = 1
-                
-                for task, level, can_untake in untakeable_tasks:
-                    if task.id in manager.active_tasks:
-                        status = "*"
-                    else:
-                        status = "✓" if task.completed else "◯"
-                    indent = "  " * level
-                    
-                    if can_untake:
-                        content = f"{status} {indent}{task.title} [{task.id[:8]}]"
-                        print(format_numbered_item(counter, len([t for t in untakeable_tasks if t[2]]), content))
-                        selectable_tasks.append(task)
-                        counter += 1
-                    else:
-                        print(f"    {status} {indent}{task.title} [{task.id[:8]}]")
-                
-                try:
-                    choice = input("\nSelect the task number to deactivate: ")
-                    task_index = int(choice) - 1
-                    
-                    if 0 <= task_index < len(selectable_tasks):
-                        task = selectable_tasks[task_index]
-                        manager.remove_active_task(task.id)
-                        print(f"Task deactivated: {task.title}")
-                    else:
-                        print("Invalid selection")
-                except (ValueError, KeyboardInterrupt):
-                    print("\nOperation cancelled")
+                chosen, task = choose_task(manager, untakeable_tasks, "Available tasks to deactivate", "Select the task number to deactivate")
+                if chosen:
+                    manager.remove_active_task(task.id)
+                    print(f"Task deactivated: {task.title}")
 
         elif args.command == 'done':
-            if args.name:
-                task = manager.find_task_by_name(args.name)
-                if task:
-                    manager.complete_task(task.id)
-                    print(f"Task marked as completed: {task.title}")
-                else:
-                    print(f"Task '{args.name}' not found")
+            if has_selection(args):
+                apply_to_selection(manager, args)
             else:
                 # Show only incomplete tasks to mark them as done
                 hierarchical_tasks = manager.get_tasks_hierarchically(show_all=True)
-                incomplete_tasks = [(task, level) for task, level in hierarchical_tasks if not task.completed and not task.clean]
+                rows = [(task, level, True) for task, level in hierarchical_tasks if not task.completed and not task.clean]
                 
-                if not incomplete_tasks:
+                if not rows:
                     print("No incomplete tasks in the project")
                     return
 
-                print("\nAvailable tasks to mark as completed:")
-                print("-" * 50)
-                
-                for i, (task, level) in enumerate(incomplete_tasks, 1):
-                    if task.id in manager.active_tasks:
-                        status = "*"
-                    else:
-                        status = "◯"
-                    indent = "  " * level
-                    content = f"{status} {indent}{task.title} [{task.id[:8]}]"
-                    print(format_numbered_item(i, len(incomplete_tasks), content))
-                
-                try:
-                    choice = input("\nSelect the task number to mark as completed: ")
-                    task_index = int(choice) - 1
-                    
-                    if 0 <= task_index < len(incomplete_tasks):
-                        task, _ = incomplete_tasks[task_index]
-                        manager.complete_task(task.id)
-                        print(f"Task marked as completed: {task.title}")
-                    else:
-                        print("Invalid selection")
-                except (ValueError, KeyboardInterrupt):
-                    print("\nOperation cancelled")
+                chosen, task = choose_task(manager, rows, "Available tasks to mark as completed", "Select the task number to mark as completed")
+                if chosen:
+                    manager.complete_task(task.id)
+                    print(f"Task marked as completed: {task.title}")
 
         elif args.command == 'undone':
-            if args.name:
-                task = manager.find_task_by_name(args.name)
-                if task:
-                    manager.uncomplete_task(task.id)
-                    print(f"Task marked as not completed: {task.title}")
-                else:
-                    print(f"Task '{args.name}' not found")
+            if has_selection(args):
+                apply_to_selection(manager, args)
             else:
                 # Show only completed tasks to mark them as undone
                 hierarchical_tasks = manager.get_tasks_hierarchically(show_all=True, show_clean=True)
-                completed_tasks = [(task, level) for task, level in hierarchical_tasks if task.completed and not task.clean]
+                rows = [(task, level, True) for task, level in hierarchical_tasks if task.completed and not task.clean]
                 
-                if not completed_tasks:
+                if not rows:
                     print("No completed tasks in the project")
                     return
 
-                print("\nAvailable tasks to mark as not completed:")
-                print("-" * 50)
-                
-                for i, (task, level) in enumerate(completed_tasks, 1):
-                    if task.id in manager.active_tasks:
-                        status = "*"
-                    else:
-                        status = "✓"
-                    indent = "  " * level
-                    content = f"{status} {indent}{task.title} [{task.id[:8]}]"
-                    print(format_numbered_item(i, len(completed_tasks), content))
-                
-                try:
-                    choice = input("\nSelect the task number to mark as not completed: ")
-                    task_index = int(choice) - 1
-                    
-                    if 0 <= task_index < len(completed_tasks):
-                        task, _ = completed_tasks[task_index]
-                        manager.uncomplete_task(task.id)
-                        print(f"Task marked as not completed: {task.title}")
-                    else:
-                        print("Invalid selection")
-                except (ValueError, KeyboardInterrupt):
-                    print("\nOperation cancelled")
+                chosen, task = choose_task(manager, rows, "Available tasks to mark as not completed", "Select the task number to mark as not completed")
+                if chosen:
+                    manager.uncomplete_task(task.id)
+                    print(f"Task marked as not completed: {task.title}")
 
     except Exception as e:
         print(f"Error: {e}")
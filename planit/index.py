@@ -0,0 +1,182 @@
+"""Secondary indexes over a project's tasks
+
+ProjectManager keeps a TaskIndex in sync with its tasks: it is built when
+the project is loaded and updated for every task touched by a change, so
+lookups never need to scan the whole project.
+"""
+import bisect
+from typing import Dict, Iterable, List, Optional, Set
+
+from .task import Task
+
+TIMESTAMP_FIELDS = ("created_at", "completed_at", "cleaned_at")
+
+# Sorts after every character that can follow a timestamp prefix
+_PREFIX_END = "\uffff"
+
+
+class TaskIndex:
+    def __init__(self):
+        # All task ids, sorted so that id prefixes can be resolved by bisection
+        self.ids: List[str] = []
+        self.completed: Set[str] = set()
+        self.clean: Set[str] = set()
+        # Lowercased titles by task id, and (title, id) pairs sorted for bisection
+        self.titles: Dict[str, str] = {}
+        self._sorted_titles: List[tuple] = []
+        # (timestamp, id) pairs sorted by timestamp for each timestamp field
+        self.timestamps: Dict[str, List[tuple]] = {field: [] for field in TIMESTAMP_FIELDS}
+        self._task_timestamps: Dict[str, tuple] = {}
+        # Dependencies: blockers per task, the reverse edges, and for every task
+        # the number of its blockers that are still open (not completed or clean)
+        self.open: Set[str] = set()
+        self.blocked: Set[str] = set()
+        self._blockers: Dict[str, tuple] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        self._pending: Dict[str, int] = {}
+
+    @classmethod
+    def build(cls, tasks: Iterable[Task]) -> "TaskIndex":
+        """Index a whole project, sorting each ordered list once instead of per task"""
+        index = cls()
+        for task in tasks:
+            index.add(task, keep_sorted=False)
+        index.ids.sort()
+        index._sorted_titles.sort()
+        for entries in index.timestamps.values():
+            entries.sort()
+        return index
+
+    def add(self, task: Task, keep_sorted: bool = True):
+        # Bulk builds append and sort afterwards (see build)
+        insert = bisect.insort if keep_sorted else list.append
+        insert(self.ids, task.id)
+        if task.completed:
+            self.completed.add(task.id)
+        if task.clean:
+            self.clean.add(task.id)
+        
+        title = task.title.lower()
+        self.titles[task.id] = title
+        insert(self._sorted_titles, (title, task.id))
+        
+        task_timestamps = tuple(getattr(task, field) for field in TIMESTAMP_FIELDS)
+        self._task_timestamps[task.id] = task_timestamps
+        for field, timestamp in zip(TIMESTAMP_FIELDS, task_timestamps):
+            if timestamp:
+                insert(self.timestamps[field], (timestamp, task.id))
+        
+        blockers = tuple(dict.fromkeys(task.blocked_by))
+        self._blockers[task.id] = blockers
+        self._pending[task.id] = 0
+        for blocker_id in blockers:
+            self._dependents.setdefault(blocker_id, set()).add(task.id)
+            if blocker_id in self.open:
+                self._adjust_pending(task.id, 1)
+        
+        if not task.completed and not task.clean:
+            self.open.add(task.id)
+            for dependent_id in self._dependents.get(task.id, ()):
+                self._adjust_pending(dependent_id, 1)
+
+    def remove(self, task_id: str):
+        if task_id not in self.titles:
+            return
+        
+        del self.ids[bisect.bisect_left(self.ids, task_id)]
+        self.completed.discard(task_id)
+        self.clean.discard(task_id)
+        
+        title = self.titles.pop(task_id)
+        position = bisect.bisect_left(self._sorted_titles, (title, task_id))
+        del self._sorted_titles[position]
+        
+        for field, timestamp in zip(TIMESTAMP_FIELDS, self._task_timestamps.pop(task_id)):
+            if timestamp:
+                entries = self.timestamps[field]
+                del entries[bisect.bisect_left(entries, (timestamp, task_id))]
+        
+        if task_id in self.open:
+            self.open.discard(task_id)
+            for dependent_id in self._dependents.get(task_id, ()):
+                self._adjust_pending(dependent_id, -1)
+        
+        for blocker_id in self._blockers.pop(task_id):
+            dependents = self._dependents[blocker_id]
+            dependents.discard(task_id)
+            if not dependents:
+                del self._dependents[blocker_id]
+        del self._pending[task_id]
+        self.blocked.discard(task_id)
+
+    def _adjust_pending(self, task_id: str, delta: int):
+        pending = self._pending[task_id] + delta
+        self._pending[task_id] = pending
+        if pending:
+            self.blocked.add(task_id)
+        else:
+            self.blocked.discard(task_id)
+
+    def update(self, task_id: str, task: Optional[Task]):
+        """Re-index a task after it changed (None if it was deleted)"""
+        self.remove(task_id)
+        if task:
+            self.add(task)
+
+    def get_dependents(self, task_id: str) -> Set[str]:
+        """Ids of the tasks blocked by the given one"""
+        return set(self._dependents.get(task_id, ()))
+
+    def find_by_id_prefix(self, prefix: str) -> List[str]:
+        """Ids starting with prefix, in sorted order"""
+        start = bisect.bisect_left(self.ids, prefix)
+        end = start
+        while end < len(self.ids) and self.ids[end].startswith(prefix):
+            end += 1
+        return self.ids[start:end]
+
+    def find_by_title(self, title: str) -> Set[str]:
+        """Ids of tasks whose title equals the given one, ignoring case"""
+        title = title.lower()
+        position = bisect.bisect_left(self._sorted_titles, (title, ""))
+        matches = set()
+        while position < len(self._sorted_titles) and self._sorted_titles[position][0] == title:
+            matches.add(self._sorted_titles[position][1])
+            position += 1
+        return matches
+
+    def search_titles(self, text: str) -> Set[str]:
+        """Ids of tasks whose title contains text, ignoring case"""
+        text = text.lower()
+        return {task_id for task_id, title in self.titles.items() if text in title}
+
+    def time_range(self, field: str, since: Optional[str] = None, until: Optional[str] = None) -> List[tuple]:
+        """(timestamp, id) pairs with since <= timestamp <= until, in time order
+
+        Bounds are compared at their own precision, so until="2026-09-30"
+        includes the whole day.
+        """
+        entries = self.timestamps[field]
+        start = bisect.bisect_left(entries, (since,)) if since else 0
+        end = bisect.bisect_left(entries, (until + _PREFIX_END,)) if until else len(entries)
+        return entries[start:end]
+
+    def find_by_time(self, field: str, op: str, value: str) -> Optional[Set[str]]:
+        """Ids whose timestamp compares to value as op does, or None if op is not a range"""
+        entries = self.timestamps[field]
+        lower = bisect.bisect_left(entries, (value,))
+        upper = bisect.bisect_left(entries, (value + _PREFIX_END,))
+        
+        if op in ("=", "=="):
+            selected = entries[lower:upper]
+        elif op == ">=":
+            selected = entries[lower:]
+        elif op == ">":
+            selected = entries[upper:]
+        elif op == "<=":
+            selected = entries[:upper]
+        elif op == "<":
+            selected = entries[:lower]
+        else:
+            return None
+        return {task_id for _, task_id in selected}
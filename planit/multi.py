@@ -0,0 +1,157 @@
+"""Query tasks across many planit projects at once"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .project_manager import ProjectManager
+from .task import Task
+
+# Directories that never contain projects worth walking into
+SKIP_DIRS = {"node_modules", "__pycache__", "venv", "env", "target", "build", "dist", "vendor"}
+
+# Below this many projects, starting worker processes costs more than it saves
+POOL_THRESHOLD = 4
+
+VIEWS = ("list", "active", "next")
+
+
+def get_cache_file() -> str:
+    """Location of the discovery index shared by every `planit multi` run"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "planit", "discovery.json")
+
+
+def _load_cache() -> Dict[str, dict]:
+    try:
+        with open(get_cache_file(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache: Dict[str, dict]):
+    cache_file = get_cache_file()
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_file = f"{cache_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        # The index is only an optimization; discovery still works without it
+        pass
+
+
+def _is_fresh(entry: dict) -> bool:
+    """A cached walk is valid while none of the directories it listed changed
+
+    Creating or removing `.planit/db.json` does not change the mtime of the
+    listed directory, so whether it exists is checked for every `.planit`
+    found. Its mtime is not used: every save replaces db.json.
+    """
+    if "planit_dirs" not in entry:
+        return False
+    for path, mtime in entry["dirs"].items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    for path, has_db in entry["planit_dirs"].items():
+        if os.path.isfile(os.path.join(path, ".planit", "db.json")) != has_db:
+            return False
+    return True
+
+
+def _walk(root: str, max_depth: int) -> Tuple[List[str], Dict[str, int], Dict[str, bool]]:
+    """Find project directories below root
+
+    Hidden and dependency directories are pruned, and the walk does not
+    descend into a project once its `.planit` directory has been found.
+    Returns the project paths, the mtime of every directory listed and,
+    for every directory holding a `.planit`, whether its db.json exists.
+    """
+    projects = []
+    dir_mtimes = {}
+    planit_dirs = {}
+    stack = [(root, 0)]
+    
+    while stack:
+        path, depth = stack.pop()
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        
+        dir_mtimes[path] = mtime
+        if any(entry.name == ".planit" for entry in entries):
+            planit_dirs[path] = os.path.isfile(os.path.join(path, ".planit", "db.json"))
+            if planit_dirs[path]:
+                projects.append(path)
+                continue
+        
+        if depth >= max_depth:
+            continue
+        
+        for entry in entries:
+            if entry.name.startswith(".") or entry.name in SKIP_DIRS:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                stack.append((entry.path, depth + 1))
+    
+    return sorted(projects), dir_mtimes, planit_dirs
+
+
+def discover_projects(root: str, max_depth: int = 4, refresh: bool = False) -> List[str]:
+    """Return the project directories below root, reusing the cached index when valid"""
+    root = os.path.realpath(os.path.expanduser(root))
+    cache = _load_cache()
+    key = f"{root}:{max_depth}"
+    
+    entry = cache.get(key)
+    if entry and not refresh and _is_fresh(entry):
+        return entry["projects"]
+    
+    projects, dir_mtimes, planit_dirs = _walk(root, max_depth)
+    cache[key] = {"projects": projects, "dirs": dir_mtimes, "planit_dirs": planit_dirs}
+    _save_cache(cache)
+    return projects
+
+
+def load_project_view(project_path: str, view: str) -> Tuple[str, List[tuple[Task, int, bool, bool]], Optional[str]]:
+    """Load one project and return (path, [(task, level, is_active, is_blocked)], error)"""
+    manager = ProjectManager(project_path)
+    try:
+        manager.load_project()
+    except (OSError, ValueError) as e:
+        return project_path, [], str(e)
+    
+    if view == "active":
+        hierarchical_tasks = manager.get_active_tasks_hierarchically()
+    elif view == "next":
+        hierarchical_tasks = [(task, 0) for task in manager.get_next_tasks()]
+    else:
+        hierarchical_tasks = [(task, level) for task, level in manager.get_tasks_hierarchically(show_all=True) if not task.clean]
+    
+    active_ids = set(manager.active_tasks)
+    # Blocked state comes from the project's index, which is not sent back from workers
+    return project_path, [
+        (task, level, task.id in active_ids, manager.is_blocked(task.id)) for task, level in hierarchical_tasks
+    ], None
+
+
+def load_project_views(project_paths: List[str], view: str) -> List[Tuple[str, List[tuple[Task, int, bool, bool]], Optional[str]]]:
+    """Load several projects, in worker processes when there are enough of them"""
+    if len(project_paths) >= POOL_THRESHOLD:
+        workers = min(len(project_paths), os.cpu_count() or 1)
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(load_project_view, project_paths, [view] * len(project_paths)))
+        except (OSError, NotImplementedError):
+            # Platforms without working multiprocessing fall back to a serial load
+            pass
+    
+    return [load_project_view(path, view) for path in project_paths]
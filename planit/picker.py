@@ -0,0 +1,151 @@
+"""Type-to-filter terminal picker for choosing one item out of many
+
+Only the standard library is used (termios/tty). Candidates are narrowed
+on every key press using a search index built once per picker, and only
+the rows that fit on screen are drawn, so the picker stays responsive
+with very large lists.
+"""
+import codecs
+import os
+import select
+import shutil
+import sys
+from typing import List, Optional
+
+try:
+    import termios
+    import tty
+except ImportError:  # Not available on Windows
+    termios = None
+    tty = None
+
+
+class SearchIndex:
+    """Lowercased titles and their ids, searched incrementally
+
+    Results for each query are kept on a stack: when the new query extends
+    the previous one, only the previous matches are searched again.
+    """
+
+    def __init__(self, titles: List[str], ids: Optional[List[str]] = None):
+        self.texts = [title.lower() for title in titles]
+        self.ids = [task_id.lower() for task_id in ids] if ids is not None else [""] * len(titles)
+        self._results = [("", list(range(len(titles))))]
+
+    def search(self, query: str) -> List[int]:
+        """Indexes of the titles containing every word of the query
+
+        A query starting with @ matches ids by prefix instead, as task
+        references on the command line do.
+        """
+        query = query.lower()
+        while len(self._results) > 1 and not query.startswith(self._results[-1][0]):
+            self._results.pop()
+        
+        previous_query, previous_matches = self._results[-1]
+        if query == previous_query:
+            return previous_matches
+        
+        if query.startswith("@"):
+            prefix = query[1:].strip()
+            matches = [i for i in previous_matches if self.ids[i].startswith(prefix)]
+        else:
+            terms = query.split()
+            matches = [i for i in previous_matches if all(term in self.texts[i] for term in terms)]
+        self._results.append((query, matches))
+        return matches
+
+
+def is_interactive() -> bool:
+    return termios is not None and sys.stdin.isatty() and sys.stdout.isatty()
+
+
+def _read_key(fd: int, decoder) -> str:
+    """Read one key press, keeping escape sequences together"""
+    key = decoder.decode(os.read(fd, 1))
+    while not key:
+        key = decoder.decode(os.read(fd, 1))
+    
+    if key == "\x1b":
+        # A lone escape has nothing following it within a short delay
+        while select.select([fd], [], [], 0.03)[0]:
+            key += decoder.decode(os.read(fd, 1))
+            if len(key) > 2 and (key[-1].isalpha() or key[-1] == "~"):
+                break
+    return key
+
+
+def pick(labels: List[str], prompt: str = "Filter", titles: Optional[List[str]] = None,
+         ids: Optional[List[str]] = None) -> Optional[int]:
+    """Let the user choose one label by typing to filter and using arrow keys
+
+    Typed text is matched against titles (the labels themselves by default),
+    or against ids by prefix when it starts with @. Returns the index of the
+    chosen label, or None if cancelled.
+    """
+    index = SearchIndex(titles if titles is not None else labels, ids)
+    query = ""
+    matches = index.search(query)
+    selected = 0
+    top = 0
+    
+    fd = sys.stdin.fileno()
+    old_settings = termios.tcgetattr(fd)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    out = sys.stdout
+    # Alternate screen buffer, so the user's scrollback is left untouched
+    out.write("\x1b[?1049h")
+    try:
+        tty.setraw(fd)
+        while True:
+            columns, lines = shutil.get_terminal_size()
+            height = max(lines - 2, 1)
+            
+            selected = min(selected, max(len(matches) - 1, 0))
+            if selected < top:
+                top = selected
+            elif selected >= top + height:
+                top = selected - height + 1
+            
+            screen = ["\x1b[H\x1b[2J", f"{prompt}> {query}"[:columns], "\r\n"]
+            for row, label_index in enumerate(matches[top:top + height], top):
+                text = labels[label_index][:columns - 2]
+                if row == selected:
+                    screen.append(f"\x1b[7m> {text}\x1b[0m\r\n")
+                else:
+                    screen.append(f"  {text}\r\n")
+            screen.append(f"\x1b[{lines};1H\x1b[2m{len(matches)}/{len(labels)}  enter: select  esc: cancel\x1b[0m")
+            screen.append(f"\x1b[1;{len(prompt) + len(query) + 3}H")
+            out.write("".join(screen))
+            out.flush()
+            
+            key = _read_key(fd, decoder)
+            if key in ("\r", "\n"):
+                return matches[selected] if matches else None
+            elif key in ("\x1b", "\x03", "\x04"):
+                return None
+            elif key in ("\x1b[A", "\x1bOA", "\x10"):
+                selected = max(selected - 1, 0)
+            elif key in ("\x1b[B", "\x1bOB", "\x0e"):
+                selected += 1
+            elif key == "\x1b[5~":
+                selected = max(selected - height, 0)
+            elif key == "\x1b[6~":
+                selected += height
+            elif key in ("\x7f", "\x08"):
+                if query:
+                    query = query[:-1]
+                    matches = index.search(query)
+                    selected = top = 0
+            elif key == "\x15":
+                query = ""
+                matches = index.search(query)
+                selected = top = 0
+            elif key.isprintable():
+                query += key
+                matches = index.search(query)
+                selected = top = 0
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+        out.write("\x1b[?1049l")
+        out.flush()
@@ -1,7 +1,60 @@
+import copy
+import functools
+import inspect
 import json
 import os
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from .index import TaskIndex
 from .task import Task
+from .timelog import append_events, load_totals
+
+# Undo history is trimmed from the oldest entry once either limit is exceeded
+HISTORY_MAX_ENTRIES = 100
+HISTORY_MAX_BYTES = 1024 * 1024
+
+# Local state that should not be committed with the project
+PLANIT_GITIGNORE = "history.jsonl\nhistory.json\ntime.log\ntime_totals.json\n*.tmp\n"
+
+# Number of hierarchical views kept by _memoized_view
+VIEW_CACHE_SIZE = 32
+
+# Orders available for the tasks of each sibling group in hierarchical views
+SORT_KEYS = ("priority", "created", "completed", "title")
+
+# Minimum possible date in Linux (Unix epoch), used for tasks missing a timestamp
+MIN_LINUX_DATE = "1970-01-01T00:00:00"
+
+
+def _memoized_view(method):
+    """Cache a view method's result until the project changes
+    
+    Results are keyed by (method, arguments, generation) in a small LRU and
+    returned as tuples so callers can share them safely.
+    """
+    signature = inspect.signature(method)
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (method.__name__, tuple(bound.arguments.items())[1:], self.generation)
+        
+        cache = self._view_cache
+        if key in cache:
+            cache.move_to_end(key)
+            self.cache_stats["hits"] += 1
+            return cache[key]
+        
+        self.cache_stats["misses"] += 1
+        result = tuple(method(self, *args, **kwargs))
+        cache[key] = result
+        if len(cache) > VIEW_CACHE_SIZE:
+            cache.popitem(last=False)
+        return result
+    
+    return wrapper
 
 
 class ProjectManager:
@@ -9,8 +62,39 @@ class ProjectManager:
         self.project_path = project_path
         self.config_dir = os.path.join(project_path, ".planit")
         self.config_file = os.path.join(self.config_dir, "db.json")
+        self.tasks_dir = os.path.join(self.config_dir, "tasks")
+        # Append-only log of changes, undos and redos, one JSON object per line
+        self.history_file = os.path.join(self.config_dir, "history.jsonl")
+        self.legacy_history_file = os.path.join(self.config_dir, "history.json")
+        self.time_log_file = os.path.join(self.config_dir, "time.log")
+        self.time_cache_file = os.path.join(self.config_dir, "time_totals.json")
         self.tasks: Dict[str, Task] = {}
         self.active_tasks: List[str] = []
+        self.index = TaskIndex()
+        
+        # Bumped whenever the project changes; keys the cached hierarchical views
+        self.generation = 0
+        self._view_cache: OrderedDict = OrderedDict()
+        self.cache_stats = {"hits": 0, "misses": 0}
+        # Sort keys by (task id, sort order), dropped when the task changes
+        self._sort_keys: Dict[tuple, tuple] = {}
+        
+        # Every task is stored in the shard of its root task (.planit/tasks/<root_id>.json)
+        self._shard_of: Dict[str, str] = {}
+        self._shards: Dict[str, Set[str]] = {}
+        self._dirty_shards: Set[str] = set()
+        self._touched: Set[str] = set()
+        # Tasks found in more than one shard file, with the shards holding a copy
+        self._shard_conflicts: Dict[str, Set[str]] = {}
+        
+        # (mtime_ns, size) of the files last read, used by reload_if_changed
+        self._manifest_stamp: Optional[tuple] = None
+        self._shard_stamps: Dict[str, tuple] = {}
+        
+        # State of the change in progress: nesting depth and the tasks it touched before modification
+        self._change_depth = 0
+        self._before: Dict[str, Optional[dict]] = {}
+        self._active_before: List[str] = []
         
         # Don't load project automatically - let CLI handle initialization
 
@@ -20,17 +104,17 @@ class ProjectManager:
             raise FileExistsError(f"File {self.config_file} already exists")
         
         # Create .planit directory if it doesn't exist
-        os.makedirs(self.config_dir, exist_ok=True)
+        os.makedirs(self.tasks_dir, exist_ok=True)
         
         data = {
             "project_name": "planit",
-            "tasks": {},
             "active_tasks": [],
             "created_at": __import__("datetime").datetime.now().isoformat()
         }
         
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        self._write_json(self.config_file, data)
+        with open(os.path.join(self.config_dir, ".gitignore"), 'w', encoding='utf-8') as f:
+            f.write(PLANIT_GITIGNORE)
         
         # Load the newly created project
         self.load_project()
@@ -39,13 +123,70 @@ class ProjectManager:
         if not os.path.exists(self.config_file):
             raise FileNotFoundError(f"{self.config_file} not found. Run from a valid project.")
         
-        with open(self.config_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data, self._manifest_stamp = self._read_json(self.config_file)
         
+        self.generation += 1
         self.tasks = {}
-        for task_id, task_data in data.get("tasks", {}).items():
-            self.tasks[task_id] = Task.from_dict(task_data)
+        self._sort_keys = {}
+        self._shard_of = {}
+        self._shards = {}
+        self._dirty_shards = set()
+        self._touched = set()
+        self._shard_stamps = {}
+        self._shard_conflicts = {}
+        
+        if "tasks" in data:
+            # Legacy single-file layout: tasks are split into shards on the next save
+            for task_id, task_data in data["tasks"].items():
+                self.tasks[task_id] = Task.from_dict(task_data)
+            self._touched.update(self.tasks)
+        else:
+            for shard_name in self._list_shard_files():
+                self._load_shard(shard_name[:-len(".json")], reindex=False)
+        
+        self.index = TaskIndex.build(self.tasks.values())
+        self._load_active_tasks(data)
+
+    def reload_if_changed(self) -> bool:
+        """Reload the project if it changed on disk since it was last read
         
+        Only shards whose mtime or size changed are parsed again. Unsaved
+        in-memory changes are discarded. Returns True if anything was reloaded.
+        """
+        if self._manifest_stamp is None or self._stat_stamp(self.config_file) == self._manifest_stamp:
+            return False
+        
+        data, manifest_stamp = self._read_json(self.config_file)
+        if "tasks" in data:
+            self.load_project()
+            return True
+        
+        current_stamps = {}
+        for shard_name in self._list_shard_files():
+            stamp = self._stat_stamp(os.path.join(self.tasks_dir, shard_name))
+            if stamp is not None:
+                current_stamps[shard_name[:-len(".json")]] = stamp
+        
+        changed = [root_id for root_id, stamp in current_stamps.items() if self._shard_stamps.get(root_id) != stamp]
+        
+        # Unload everything first: a task moved between two changed shards would
+        # otherwise be seen in both and taken for a duplicate
+        for root_id in list(self._shard_stamps):
+            if root_id not in current_stamps:
+                self._unload_shard(root_id)
+        for root_id in changed:
+            self._unload_shard(root_id)
+        for root_id in changed:
+            self._load_shard(root_id)
+        
+        self._touched = set()
+        self._dirty_shards = set()
+        self.generation += 1
+        self._manifest_stamp = manifest_stamp
+        self._load_active_tasks(data)
+        return True
+
+    def _load_active_tasks(self, data: dict):
         # Handle migration from single active_task to active_tasks list
         old_active_task = data.get("active_task")
         if old_active_task:
@@ -53,28 +194,388 @@ class ProjectManager:
         else:
             self.active_tasks = data.get("active_tasks", [])
 
-    def save_project(self):
+    def _load_shard(self, root_id: str, reindex: bool = True):
+        """Read a shard's tasks; reindex=False leaves indexing to the caller (full loads)"""
+        try:
+            shard, self._shard_stamps[root_id] = self._read_json(os.path.join(self.tasks_dir, f"{root_id}.json"))
+        except FileNotFoundError:
+            # Removed by a concurrent save between listing and reading
+            return
+        
+        for task_id, task_data in shard.get("tasks", {}).items():
+            previous_root = self._shard_of.get(task_id)
+            if previous_root is not None and previous_root != root_id:
+                # The same task stored twice: the copy read last wins until `fsck --repair`
+                self._shards[previous_root].discard(task_id)
+                if not self._shards[previous_root]:
+                    del self._shards[previous_root]
+                self._shard_conflicts.setdefault(task_id, {previous_root}).add(root_id)
+            self.tasks[task_id] = Task.from_dict(task_data)
+            if reindex:
+                self.index.update(task_id, self.tasks[task_id])
+            self._forget_sort_keys(task_id)
+            self._shard_of[task_id] = root_id
+            self._shards.setdefault(root_id, set()).add(task_id)
+
+    def _unload_shard(self, root_id: str):
+        for task_id in self._shards.pop(root_id, set()):
+            # A task may have been moved to another shard that was already reloaded
+            if self._shard_of.get(task_id) == root_id:
+                del self._shard_of[task_id]
+                self.tasks.pop(task_id, None)
+                self.index.remove(task_id)
+                self._forget_sort_keys(task_id)
+        self._shard_stamps.pop(root_id, None)
+
+    def _read_json(self, path: str) -> tuple[dict, tuple]:
+        """Read a JSON file and return it with the stamp of the version read"""
+        with open(path, 'r', encoding='utf-8') as f:
+            stat = os.fstat(f.fileno())
+            return json.load(f), (stat.st_mtime_ns, stat.st_size)
+
+    def _stat_stamp(self, path: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def save_project(self, full: bool = False):
+        """Write the manifest and the shards touched since the last save
+        
+        Args:
+            full: If True, rewrite every shard and drop stale shard files
+        """
+        self._commit_touched()
+        self.generation += 1
+        
+        os.makedirs(self.tasks_dir, exist_ok=True)
+        if full:
+            shard_ids = set(self._shards)
+            shard_ids.update(name[:-len(".json")] for name in self._list_shard_files())
+        else:
+            shard_ids = self._dirty_shards
+        
+        for root_id in shard_ids:
+            shard_path = os.path.join(self.tasks_dir, f"{root_id}.json")
+            if root_id in self._shards:
+                shard = {
+                    "root": root_id,
+                    "tasks": {task_id: self.tasks[task_id].to_dict() for task_id in self._shard_order(root_id)}
+                }
+                self._write_json(shard_path, shard)
+                self._shard_stamps[root_id] = self._stat_stamp(shard_path)
+            else:
+                if os.path.exists(shard_path):
+                    os.remove(shard_path)
+                self._shard_stamps.pop(root_id, None)
+        self._dirty_shards = set()
+        
+        # The manifest is written last so watchers only need to check its mtime.
+        # It holds no save time: branches that both changed something would conflict on it.
         data = {
             "project_name": "planit",
-            "tasks": {task_id: task.to_dict() for task_id, task in self.tasks.items()},
-            "active_tasks": self.active_tasks,
-            "updated_at": __import__("datetime").datetime.now().isoformat()
+            "active_tasks": self.active_tasks
         }
         
-        with open(self.config_file, 'w', encoding='utf-8') as f:
+        self._write_json(self.config_file, data)
+        self._manifest_stamp = self._stat_stamp(self.config_file)
+
+    def _commit_touched(self):
+        """Bring shard membership and the index up to date with the touched tasks"""
+        self._assign_shards(self._touched)
+        for task_id in self._touched:
+            self.index.update(task_id, self.tasks.get(task_id))
+            self._forget_sort_keys(task_id)
+        self._touched = set()
+
+    def _write_json(self, path: str, data: dict):
+        """Write JSON atomically so an interrupted save never leaves a truncated file"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _list_shard_files(self) -> List[str]:
+        if not os.path.isdir(self.tasks_dir):
+            return []
+        return sorted(name for name in os.listdir(self.tasks_dir) if name.endswith(".json"))
+
+    def _touch(self, task_id: str):
+        """Record that a task is about to change
+        
+        Its shard is rewritten on the next save and, inside a change, its
+        current state is kept so the change can be undone.
+        """
+        if self._change_depth and task_id not in self._before:
+            self._before[task_id] = self._snapshot(task_id)
+        self._touched.add(task_id)
+
+    def _snapshot(self, task_id: str) -> Optional[dict]:
+        task = self.tasks.get(task_id)
+        return copy.deepcopy(task.to_dict()) if task else None
+
+    @contextmanager
+    def _change(self, command: str, label: str = "", record: bool = True, full_save: bool = False):
+        """Group the mutations of one command into a single save and history entry
+        
+        Nested changes join the outermost one. full_save rewrites every shard
+        and drops stale shard files (see save_project). If the outermost
+        change raises, the tasks and active list are restored as they were.
+        """
+        if self._change_depth:
+            self._change_depth += 1
+            try:
+                yield
+            finally:
+                self._change_depth -= 1
+            return
+        
+        self._change_depth = 1
+        self._before = {}
+        self._active_before = list(self.active_tasks)
+        try:
+            yield
+        except BaseException:
+            self._rollback()
+            raise
+        finally:
+            self._change_depth = 0
+        
+        if record:
+            self._record_change(command, label)
+        self._before = {}
+        self.save_project(full=full_save)
+        
+        # Log activation intervals; completing, cleaning or deleting an active task closes its interval
+        active_before = set(self._active_before)
+        active_after = set(self.active_tasks)
+        append_events(
+            self.time_log_file,
+            started=[task_id for task_id in self.active_tasks if task_id not in active_before],
+            stopped=[task_id for task_id in self._active_before if task_id not in active_after]
+        )
+
+    def _rollback(self):
+        """Undo the in-memory effects of a change that raised"""
+        for task_id, state in self._before.items():
+            if state is None:
+                self.tasks.pop(task_id, None)
+            else:
+                self.tasks[task_id] = Task.from_dict(state)
+            self._touched.discard(task_id)
+        self.active_tasks = self._active_before
+        self._before = {}
+        # Views cached during the change may hold the modified tasks
+        self.generation += 1
+
+    def batch(self, command: str, label: str = ""):
+        """Apply several operations as one change: a single save and one undo step
+        
+        Usage: `with manager.batch("done"): ...`. If an operation raises,
+        nothing is written and the tasks and active list are restored.
+        """
+        return self._change(command, label)
+
+    def _record_change(self, command: str, label: str):
+        active_before = set(self._active_before)
+        active_after = set(self.active_tasks)
+        entry = {
+            "command": command,
+            "label": label,
+            "at": __import__("datetime").datetime.now().isoformat(),
+            "before": self._before,
+            "after": {task_id: self._snapshot(task_id) for task_id in self._before},
+            "active_added": [task_id for task_id in self.active_tasks if task_id not in active_before],
+            "active_removed": [task_id for task_id in self._active_before if task_id not in active_after]
+        }
+        if not entry["before"] and not entry["active_added"] and not entry["active_removed"]:
+            return
+        
+        self._append_history({"op": "change", "entry": entry})
+
+    def load_history(self) -> dict:
+        """Get the undo and redo stacks, oldest entry first
+        
+        The log is replayed: "change" pushes an entry and clears the redo
+        stack, "undo" and "redo" move the top entry between the stacks.
+        """
+        self._migrate_history()
+        undo, redo = [], []
+        if os.path.exists(self.history_file):
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Line cut short by an interrupted append
+                        continue
+                    if record["op"] == "change":
+                        undo.append(record["entry"])
+                        redo = []
+                        if len(undo) > HISTORY_MAX_ENTRIES:
+                            del undo[0]
+                    elif record["op"] == "undo" and undo:
+                        redo.append(undo.pop())
+                    elif record["op"] == "redo" and redo:
+                        undo.append(redo.pop())
+        return {"undo": undo, "redo": redo}
+
+    def _append_history(self, record: dict):
+        """Append one record to the history log, compacting it once it outgrows the byte limit"""
+        self._migrate_history()
+        os.makedirs(self.config_dir, exist_ok=True)
+        with open(self.history_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            size = f.tell()
+        if size > HISTORY_MAX_BYTES:
+            self._write_history(self.load_history())
+
+    def _migrate_history(self):
+        """Convert the single-document history.json used before the log"""
+        if not os.path.exists(self.legacy_history_file):
+            return
+        with open(self.legacy_history_file, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+        os.remove(self.legacy_history_file)
+        self._write_history({"undo": history.get("undo", []), "redo": history.get("redo", [])})
+
+    def _write_history(self, history: dict):
+        """Rewrite the log with only the current stacks, trimming the oldest undo entries
+        
+        The log is trimmed to half the byte limit so that compaction only
+        happens again after many more changes.
+        """
+        undo = history["undo"]
+        redo = history["redo"]
+        lines = [json.dumps({"op": "change", "entry": entry}, ensure_ascii=False) + "\n" for entry in undo]
+        # Redo entries are replayed as changes undone again, most recently undone last
+        redo_lines = [json.dumps({"op": "change", "entry": entry}, ensure_ascii=False) + "\n" for entry in reversed(redo)]
+        redo_lines += [json.dumps({"op": "undo"}) + "\n"] * len(redo)
+        total = sum(len(line) for line in lines + redo_lines)
+        
+        # Always keep the newest entry, even if it alone exceeds the byte limit
+        dropped = 0
+        while len(lines) - dropped > 1 and (len(lines) - dropped > HISTORY_MAX_ENTRIES or total > HISTORY_MAX_BYTES // 2):
+            total -= len(lines[dropped])
+            dropped += 1
+        
+        os.makedirs(self.config_dir, exist_ok=True)
+        with open(f"{self.history_file}.tmp", 'w', encoding='utf-8') as f:
+            f.writelines(lines[dropped:] + redo_lines)
+        os.replace(f"{self.history_file}.tmp", self.history_file)
+
+    def undo(self) -> Optional[dict]:
+        """Revert the most recent change and return its history entry"""
+        history = self.load_history()
+        if not history["undo"]:
+            return None
+        
+        entry = history["undo"][-1]
+        self._apply_states(entry["before"], added=entry["active_removed"], removed=entry["active_added"])
+        self._append_history({"op": "undo"})
+        return entry
+
+    def redo(self) -> Optional[dict]:
+        """Reapply the most recently undone change and return its history entry"""
+        history = self.load_history()
+        if not history["redo"]:
+            return None
+        
+        entry = history["redo"][-1]
+        self._apply_states(entry["after"], added=entry["active_added"], removed=entry["active_removed"])
+        self._append_history({"op": "redo"})
+        return entry
+
+    def _apply_states(self, states: Dict[str, Optional[dict]], added: List[str], removed: List[str]):
+        """Restore recorded task states (None meaning the task did not exist)"""
+        with self._change("undo", record=False):
+            for task_id, state in states.items():
+                self._touch(task_id)
+                if state is None:
+                    self.tasks.pop(task_id, None)
+                else:
+                    self.tasks[task_id] = Task.from_dict(copy.deepcopy(state))
+            
+            # Descendants of moved tasks may now belong to another shard
+            for task_id in states:
+                if task_id in self.tasks:
+                    self._touch_subtree(task_id)
+            
+            self.active_tasks = [task_id for task_id in self.active_tasks if task_id not in removed]
+            for task_id in added:
+                if task_id in self.tasks and task_id not in self.active_tasks:
+                    self.active_tasks.append(task_id)
+
+    def _touch_subtree(self, task_id: str):
+        """Mark a subtree for shard reassignment on the next save
+        
+        Unlike _touch, no undo snapshots are taken: descendants only change
+        shard, and undoing restores the subtree root and re-touches it.
+        """
+        self._touched.update(self.get_subtree_ids(task_id))
+
+    def _find_root(self, task_id: str) -> str:
+        """Follow parent links up to the topmost existing ancestor"""
+        seen = {task_id}
+        task = self.tasks[task_id]
+        while task.parent_id and task.parent_id in self.tasks and task.parent_id not in seen:
+            seen.add(task.parent_id)
+            task = self.tasks[task.parent_id]
+        return task.id
+
+    def _assign_shards(self, task_ids: Set[str]):
+        """Move touched tasks to the shard of their current root and mark shards dirty"""
+        for task_id in task_ids:
+            old_root = self._shard_of.get(task_id)
+            new_root = self._find_root(task_id) if task_id in self.tasks else None
+            
+            if old_root is not None:
+                self._dirty_shards.add(old_root)
+                if old_root != new_root:
+                    members = self._shards[old_root]
+                    members.discard(task_id)
+                    if not members:
+                        del self._shards[old_root]
+                    del self._shard_of[task_id]
+            
+            if new_root is not None:
+                self._dirty_shards.add(new_root)
+                self._shard_of[task_id] = new_root
+                self._shards.setdefault(new_root, set()).add(task_id)
+
+    def _shard_order(self, root_id: str) -> List[str]:
+        """Shard members in depth-first order so rewrites produce stable diffs"""
+        members = self._shards[root_id]
+        ordered = []
+        seen = set()
+        stack = [root_id]
+        while stack:
+            task_id = stack.pop()
+            if task_id in seen or task_id not in members:
+                continue
+            seen.add(task_id)
+            ordered.append(task_id)
+            stack.extend(reversed(self.tasks[task_id].subtasks))
+        ordered.extend(sorted(members - seen))
+        return ordered
 
     def create_task(self, title: str, description: str = "", parent_id: Optional[str] = None) -> str:
         task = Task(title, description, parent_id)
-        self.tasks[task.id] = task
         
         if parent_id and parent_id in self.tasks:
             parent_task = self.tasks[parent_id]
             if parent_task.clean:
                 raise ValueError("Cannot add subtasks to clean tasks")
-            parent_task.add_subtask(task.id)
         
-        self.save_project()
+        with self._change("create", title):
+            self._touch(task.id)
+            self.tasks[task.id] = task
+            
+            if parent_id and parent_id in self.tasks:
+                self._touch(parent_id)
+                self.tasks[parent_id].add_subtask(task.id)
+        
         return task.id
 
     def add_active_task(self, task_id: str):
@@ -84,15 +585,67 @@ class ProjectManager:
         task = self.tasks[task_id]
         if task.clean:
             raise ValueError("Cannot activate clean tasks")
+        if self.is_blocked(task_id):
+            blockers = ", ".join(blocker.title for blocker in self.get_blockers(task_id))
+            raise ValueError(f"Cannot activate blocked task (blocked by: {blockers})")
         
         if task_id not in self.active_tasks:
-            self.active_tasks.append(task_id)
-            self.save_project()
+            with self._change("take", task.title):
+                self.active_tasks.append(task_id)
 
     def remove_active_task(self, task_id: str):
         if task_id in self.active_tasks:
-            self.active_tasks.remove(task_id)
-            self.save_project()
+            with self._change("untake", self.tasks[task_id].title if task_id in self.tasks else task_id):
+                self.active_tasks.remove(task_id)
+
+    def add_dependency(self, task_id: str, blocker_id: str):
+        """Mark a task as blocked by another one until that one is completed or clean"""
+        if task_id not in self.tasks:
+            raise ValueError(f"Task with ID {task_id} not found")
+        if blocker_id not in self.tasks:
+            raise ValueError(f"Task with ID {blocker_id} not found")
+        if task_id == blocker_id:
+            raise ValueError("A task cannot block itself")
+        
+        task = self.tasks[task_id]
+        if blocker_id in task.blocked_by:
+            return
+        
+        # The new edge closes a cycle if the blocker already depends on the task
+        seen = set()
+        stack = [blocker_id]
+        while stack:
+            current_id = stack.pop()
+            if current_id == task_id:
+                raise ValueError(f"Circular dependency: {self.tasks[blocker_id].title} already depends on {task.title}")
+            if current_id in seen or current_id not in self.tasks:
+                continue
+            seen.add(current_id)
+            stack.extend(self.tasks[current_id].blocked_by)
+        
+        with self._change("block", task.title):
+            self._touch(task_id)
+            task.blocked_by.append(blocker_id)
+            task.updated_at = __import__("datetime").datetime.now().isoformat()
+
+    def remove_dependency(self, task_id: str, blocker_id: str):
+        task = self.tasks.get(task_id)
+        if task and blocker_id in task.blocked_by:
+            with self._change("unblock", task.title):
+                self._touch(task_id)
+                task.blocked_by.remove(blocker_id)
+                task.updated_at = __import__("datetime").datetime.now().isoformat()
+
+    def is_blocked(self, task_id: str) -> bool:
+        """Whether any of the task's blockers is still open"""
+        return task_id in self.index.blocked
+
+    def get_blockers(self, task_id: str) -> List[Task]:
+        """Get the blockers of a task that are still open"""
+        task = self.tasks.get(task_id)
+        if not task:
+            return []
+        return [self.tasks[blocker_id] for blocker_id in task.blocked_by if blocker_id in self.index.open]
 
     def get_active_tasks(self) -> List[Task]:
         return [self.tasks[task_id] for task_id in self.active_tasks if task_id in self.tasks]
@@ -100,7 +653,20 @@ class ProjectManager:
     def get_inactive_tasks(self) -> List[Task]:
         return [task for task in self.tasks.values() if task.id not in self.active_tasks and not task.completed and not task.clean]
 
-    def get_active_tasks_hierarchically(self) -> List[tuple[Task, int]]:
+    def get_next_tasks(self) -> List[Task]:
+        """Get open, inactive, unblocked tasks that have no open subtasks left, oldest first"""
+        def is_open(task: Task) -> bool:
+            return not task.completed and not task.clean
+        
+        next_tasks = [
+            task for task in self.get_inactive_tasks()
+            if not self.is_blocked(task.id) and not any(subtask_id in self.tasks and is_open(self.tasks[subtask_id]) for subtask_id in task.subtasks)
+        ]
+        next_tasks.sort(key=self._sibling_sort_key("priority"))
+        return next_tasks
+
+    @_memoized_view
+    def get_active_tasks_hierarchically(self, sort: str = "priority") -> Tuple[tuple[Task, int], ...]:
         """Get active tasks with their hierarchical structure including parent tasks"""
         # Get all tasks that are active or are parents of active tasks
         relevant_tasks = set()
@@ -119,6 +685,7 @@ class ProjectManager:
         
         # Build hierarchical structure
         all_tasks = []
+        sort_key = self._sibling_sort_key(sort)
         
         def add_task_and_subtasks(task: Task, level: int = 0):
             """Add task and its subtasks to the list if they are relevant"""
@@ -126,19 +693,50 @@ class ProjectManager:
                 all_tasks.append((task, level))
                 
                 # Add subtasks that are relevant
-                for subtask_id in task.subtasks:
-                    if subtask_id in self.tasks and self.tasks[subtask_id].id in relevant_tasks:
-                        add_task_and_subtasks(self.tasks[subtask_id], level + 1)
+                subtasks = [self.tasks[subtask_id] for subtask_id in task.subtasks if subtask_id in relevant_tasks]
+                for subtask in self._sort_siblings(subtasks, sort_key):
+                    add_task_and_subtasks(subtask, level + 1)
         
         # Start from root tasks
         root_tasks = [task for task in self.tasks.values() if not task.parent_id]
         
-        for root_task in root_tasks:
+        for root_task in self._sort_siblings(root_tasks, sort_key):
             add_task_and_subtasks(root_task)
         
         return all_tasks
 
-    def get_takeable_tasks_hierarchically(self) -> List[tuple[Task, int, bool]]:
+    def get_filtered_tasks_hierarchically(self, task_ids: Set[str], sort: str = "priority") -> List[tuple[Task, int]]:
+        """Get the given tasks with their parent tasks as hierarchical context
+        
+        Only the selected tasks and their ancestors are visited, so the cost
+        does not depend on the size of the project.
+        """
+        relevant_tasks = set()
+        root_ids = set()
+        for task_id in task_ids:
+            while task_id in self.tasks and task_id not in relevant_tasks:
+                relevant_tasks.add(task_id)
+                parent_id = self.tasks[task_id].parent_id
+                if not parent_id or parent_id not in self.tasks:
+                    root_ids.add(task_id)
+                task_id = parent_id
+        
+        all_tasks = []
+        sort_key = self._sibling_sort_key(sort)
+        
+        def add_task_and_subtasks(task: Task, level: int = 0):
+            all_tasks.append((task, level))
+            subtasks = [self.tasks[subtask_id] for subtask_id in task.subtasks if subtask_id in relevant_tasks]
+            for subtask in self._sort_siblings(subtasks, sort_key):
+                add_task_and_subtasks(subtask, level + 1)
+        
+        for root_task in self._sort_siblings((self.tasks[task_id] for task_id in root_ids), sort_key):
+            add_task_and_subtasks(root_task)
+        
+        return all_tasks
+
+    @_memoized_view
+    def get_takeable_tasks_hierarchically(self) -> Tuple[tuple[Task, int, bool], ...]:
         """Get tasks that can be activated with hierarchical structure
         Returns list of (task, level, can_take)"""
         # Get only incomplete and inactive tasks
@@ -146,13 +744,14 @@ class ProjectManager:
         result = []
         
         for task, level in hierarchical_tasks:
-            # Task can be taken if it's not completed, not clean, and not already active
-            can_take = not task.completed and not task.clean and task.id not in self.active_tasks
+            # Task can be taken if it's not completed, not clean, not blocked and not already active
+            can_take = not task.completed and not task.clean and task.id not in self.active_tasks and not self.is_blocked(task.id)
             result.append((task, level, can_take))
         
         return result
 
-    def get_untakeable_tasks_hierarchically(self) -> List[tuple[Task, int, bool]]:
+    @_memoized_view
+    def get_untakeable_tasks_hierarchically(self) -> Tuple[tuple[Task, int, bool], ...]:
         """Get tasks that can be deactivated with hierarchical structure
         Returns list of (task, level, can_untake)"""
         # Get only active tasks and their parents up to root
@@ -166,9 +765,10 @@ class ProjectManager:
         
         return result
 
-    def get_completed_tasks_hierarchically(self) -> List[tuple[Task, int]]:
+    @_memoized_view
+    def get_completed_tasks_hierarchically(self, sort: str = "priority") -> Tuple[tuple[Task, int], ...]:
         """Get only completed tasks with hierarchical structure"""
-        hierarchical_tasks = self.get_tasks_hierarchically(show_all=True)
+        hierarchical_tasks = self.get_tasks_hierarchically(show_all=True, sort=sort)
         result = []
         
         for task, level in hierarchical_tasks:
@@ -180,6 +780,24 @@ class ProjectManager:
     def get_task(self, task_id: str) -> Optional[Task]:
         return self.tasks.get(task_id)
 
+    def find_task(self, reference: str) -> Optional[Task]:
+        """Find a task by name, or by id prefix when the reference starts with @"""
+        if reference.startswith("@"):
+            return self.find_task_by_id_prefix(reference[1:])
+        return self.find_task_by_name(reference)
+
+    def find_task_by_id_prefix(self, prefix: str) -> Optional[Task]:
+        """Find the task whose id starts with prefix
+        
+        Raises ValueError listing the candidates if the prefix is ambiguous.
+        """
+        matches = self.index.find_by_id_prefix(prefix.lower()) if prefix else []
+        if len(matches) > 1:
+            candidates = ", ".join(f"{task_id[:8]} ({self.tasks[task_id].title})" for task_id in matches[:10])
+            more = f" and {len(matches) - 10} more" if len(matches) > 10 else ""
+            raise ValueError(f"Ambiguous id prefix '{prefix}' matches {candidates}{more}")
+        return self.tasks[matches[0]] if matches else None
+
     def find_task_by_name(self, name: str) -> Optional[Task]:
         for task in self.tasks.values():
             if task.title.lower() == name.lower():
@@ -209,16 +827,102 @@ class ProjectManager:
         
         return [self.tasks[subtask_id] for subtask_id in parent.subtasks if subtask_id in self.tasks]
 
-    def _get_min_linux_date(self) -> str:
-        """Returns the minimum possible date in Linux (Unix epoch)"""
-        return __import__("datetime").datetime(1970, 1, 1, 0, 0, 0).isoformat()
+    def get_root_id(self, task_id: str) -> str:
+        """Get the id of the root task of the subtree containing a task"""
+        return self._find_root(task_id)
+
+    def get_time_report(self, task_id: Optional[str] = None, since: Optional[int] = None) -> List[tuple[Task, int, int, int]]:
+        """Get tracked time per task with subtree rollups
+        
+        Returns (task, level, own_seconds, subtree_seconds) rows in hierarchical
+        order for every task whose subtree has tracked time, starting at the
+        given task or at all root tasks.
+        
+        Args:
+            task_id: Only report this task and its subtasks
+            since: Unix time; only count activity after it
+        """
+        totals = load_totals(self.time_log_file, self.time_cache_file, since)
+        rows = []
+        
+        def add_task_and_subtasks(task: Task, level: int) -> int:
+            position = len(rows)
+            rows.append(None)
+            subtree_total = totals.get(task.id, 0)
+            for subtask_id in task.subtasks:
+                if subtask_id in self.tasks:
+                    subtree_total += add_task_and_subtasks(self.tasks[subtask_id], level + 1)
+            
+            if subtree_total:
+                rows[position] = (task, level, totals.get(task.id, 0), subtree_total)
+            else:
+                # Nothing tracked anywhere below this task
+                del rows[position:]
+            return subtree_total
+        
+        if task_id:
+            start_tasks = [self.tasks[task_id]] if task_id in self.tasks else []
+        else:
+            start_tasks = [task for task in self.tasks.values() if not task.parent_id]
+        for task in start_tasks:
+            add_task_and_subtasks(task, 0)
+        
+        return rows
+
+    def get_subtree_ids(self, task_id: str) -> Set[str]:
+        """Get the ids of a task and all its descendants"""
+        subtree_ids = set()
+        stack = [task_id]
+        while stack:
+            current_id = stack.pop()
+            if current_id in subtree_ids or current_id not in self.tasks:
+                continue
+            subtree_ids.add(current_id)
+            stack.extend(self.tasks[current_id].subtasks)
+        return subtree_ids
+
+    def _sort_siblings(self, tasks: Iterable[Task], sort_key: Callable[[Task], tuple]) -> List[Task]:
+        """Order a group of sibling tasks; ties keep their stored order"""
+        tasks = list(tasks)
+        if len(tasks) < 2:
+            return tasks
+        return sorted(tasks, key=sort_key)
 
-    def _get_task_priority(self, task: Task) -> tuple:
-        """Get priority tuple for sorting: (priority_category, date_priority)"""
-        # Priority categories: 0=taken, 1=undone, 2=done, 3=clean
-        if task.id in self.active_tasks:
-            priority_category = 0
-        elif task.clean:
+    def _sibling_sort_key(self, sort: str) -> Callable[[Task], tuple]:
+        """Get the key function for a sort order, with keys cached until their task changes"""
+        cache = self._sort_keys
+        compute = self._compute_sort_key
+        active_ids = set(self.active_tasks) if sort == "priority" else ()
+        
+        def sort_key(task: Task) -> tuple:
+            cache_key = (task.id, sort)
+            key = cache.get(cache_key)
+            if key is None:
+                key = cache[cache_key] = compute(task, sort)
+            # Being taken is stored in the manifest, not the task, so it is applied outside the cache
+            if task.id in active_ids:
+                return (0,) + key[1:]
+            return key
+        
+        return sort_key
+
+    def _forget_sort_keys(self, task_id: str):
+        for sort in SORT_KEYS:
+            self._sort_keys.pop((task_id, sort), None)
+
+    def _compute_sort_key(self, task: Task, sort: str) -> tuple:
+        if sort == "created":
+            return (task.created_at or MIN_LINUX_DATE,)
+        if sort == "completed":
+            # Completed tasks in completion order, open tasks after them
+            return (task.completed_at is None, task.completed_at or MIN_LINUX_DATE, task.created_at or MIN_LINUX_DATE)
+        if sort == "title":
+            return (task.title.casefold(), task.created_at or MIN_LINUX_DATE)
+        if sort != "priority":
+            raise ValueError(f"Unknown sort order: {sort} (expected one of {', '.join(SORT_KEYS)})")
+        
+        # Priority categories: 0=taken (applied by _sibling_sort_key), 1=undone, 2=done, 3=clean
+        if task.clean:
             priority_category = 3
         elif task.completed:
             priority_category = 2
@@ -230,23 +934,27 @@ class ProjectManager:
             task.cleaned_at or 
             task.completed_at or 
             task.created_at or 
-            self._get_min_linux_date()
+            MIN_LINUX_DATE
         )
         
         return (priority_category, date_priority)
 
-    def get_tasks_hierarchically(self, show_completed: bool = False, show_all: bool = False, show_clean: bool = False) -> List[tuple[Task, int]]:
+    @_memoized_view
+    def get_tasks_hierarchically(self, show_completed: bool = False, show_all: bool = False, show_clean: bool = False,
+                                 sort: str = "priority") -> Tuple[tuple[Task, int], ...]:
         """Get tasks in hierarchical order (parent tasks first, then subtasks)
         
         Args:
             show_completed: If True, show structure with completed tasks highlighted
             show_all: If True, show all tasks regardless of completion status
             show_clean: If True, show clean tasks (default: False)
+            sort: Order of the tasks within each sibling group, one of SORT_KEYS
         """
         # Always start with all root tasks to maintain structure
         root_tasks = [task for task in self.tasks.values() if not task.parent_id]
         
         all_tasks = []
+        sort_key = self._sibling_sort_key(sort)
         
         def add_task_and_subtasks(task: Task, level: int = 0):
             # Skip clean tasks unless explicitly requested
@@ -273,90 +981,115 @@ class ProjectManager:
             
             all_tasks.append((task, level))
             
-            # Always add all subtasks to maintain structure
-            for subtask_id in task.subtasks:
-                if subtask_id in self.tasks:
-                    add_task_and_subtasks(self.tasks[subtask_id], level + 1)
+            # Always add all subtasks to maintain structure; sorting within each
+            # sibling group keeps children directly under their parent
+            subtasks = [self.tasks[subtask_id] for subtask_id in task.subtasks if subtask_id in self.tasks]
+            for subtask in self._sort_siblings(subtasks, sort_key):
+                add_task_and_subtasks(subtask, level + 1)
         
-        for root_task in root_tasks:
+        for root_task in self._sort_siblings(root_tasks, sort_key):
             add_task_and_subtasks(root_task)
         
-        # Sort tasks by priority
-        all_tasks.sort(key=lambda x: self._get_task_priority(x[0]))
-        
         return all_tasks
 
     def complete_task(self, task_id: str):
         if task_id in self.tasks:
-            self.tasks[task_id].mark_completed()
-            
-            # Remove from active tasks
-            if task_id in self.active_tasks:
-                self.active_tasks.remove(task_id)
-            
-            # Mark all subtasks as completed recursively
-            for subtask_id in self.tasks[task_id].subtasks:
-                if subtask_id in self.tasks:
-                    self.complete_task(subtask_id)
-            
-            self.save_project()
+            with self._change("done", self.tasks[task_id].title):
+                self._complete_subtree(task_id)
+
+    def _complete_subtree(self, task_id: str):
+        self._touch(task_id)
+        self.tasks[task_id].mark_completed()
+        
+        # Remove from active tasks
+        if task_id in self.active_tasks:
+            self.active_tasks.remove(task_id)
+        
+        # Mark all subtasks as completed recursively
+        for subtask_id in self.tasks[task_id].subtasks:
+            if subtask_id in self.tasks:
+                self._complete_subtree(subtask_id)
 
     def uncomplete_task(self, task_id: str):
         if task_id in self.tasks:
-            self.tasks[task_id].mark_uncompleted()
-            
-            # Mark all subtasks as uncompleted recursively
-            for subtask_id in self.tasks[task_id].subtasks:
-                if subtask_id in self.tasks:
-                    self.uncomplete_task(subtask_id)
-            
-            self.save_project()
+            with self._change("undone", self.tasks[task_id].title):
+                self._uncomplete_subtree(task_id)
+
+    def _uncomplete_subtree(self, task_id: str):
+        self._touch(task_id)
+        self.tasks[task_id].mark_uncompleted()
+        
+        # Mark all subtasks as uncompleted recursively
+        for subtask_id in self.tasks[task_id].subtasks:
+            if subtask_id in self.tasks:
+                self._uncomplete_subtree(subtask_id)
 
     def delete_task(self, task_id: str):
         if task_id in self.tasks:
             task = self.tasks[task_id]
             
-            for subtask_id in task.subtasks:
-                self.delete_task(subtask_id)
-            
-            if task.parent_id and task.parent_id in self.tasks:
-                parent = self.tasks[task.parent_id]
-                if task_id in parent.subtasks:
-                    parent.subtasks.remove(task_id)
-            
-            if task_id in self.active_tasks:
-                self.active_tasks.remove(task_id)
-            
-            del self.tasks[task_id]
-            self.save_project()
+            with self._change("delete", task.title):
+                if task.parent_id and task.parent_id in self.tasks:
+                    parent = self.tasks[task.parent_id]
+                    if task_id in parent.subtasks:
+                        self._touch(parent.id)
+                        parent.subtasks.remove(task_id)
+                
+                self._delete_subtree(task_id)
+
+    def _delete_subtree(self, task_id: str):
+        task = self.tasks[task_id]
+        
+        for subtask_id in task.subtasks:
+            if subtask_id in self.tasks:
+                self._delete_subtree(subtask_id)
+        
+        if task_id in self.active_tasks:
+            self.active_tasks.remove(task_id)
+        
+        # Drop the dependency edges pointing at the deleted task
+        for dependent_id in self.index.get_dependents(task_id):
+            dependent = self.tasks.get(dependent_id)
+            if dependent and task_id in dependent.blocked_by:
+                self._touch(dependent_id)
+                dependent.blocked_by.remove(task_id)
+        
+        self._touch(task_id)
+        del self.tasks[task_id]
 
     def clean_task(self, task_id: str):
         """Mark a task and all its subtasks as clean"""
         if task_id in self.tasks:
-            self.tasks[task_id].mark_clean()
-            
-            # Remove from active tasks
-            if task_id in self.active_tasks:
-                self.active_tasks.remove(task_id)
-            
-            # Mark all subtasks as clean recursively
-            for subtask_id in self.tasks[task_id].subtasks:
-                if subtask_id in self.tasks:
-                    self.clean_task(subtask_id)
-            
-            self.save_project()
+            with self._change("clean", self.tasks[task_id].title):
+                self._clean_subtree(task_id)
+
+    def _clean_subtree(self, task_id: str):
+        self._touch(task_id)
+        self.tasks[task_id].mark_clean()
+        
+        # Remove from active tasks
+        if task_id in self.active_tasks:
+            self.active_tasks.remove(task_id)
+        
+        # Mark all subtasks as clean recursively
+        for subtask_id in self.tasks[task_id].subtasks:
+            if subtask_id in self.tasks:
+                self._clean_subtree(subtask_id)
 
     def unclean_task(self, task_id: str):
         """Mark a task and all its subtasks as unclean"""
         if task_id in self.tasks:
-            self.tasks[task_id].mark_unclean()
-            
-            # Mark all subtasks as unclean recursively
-            for subtask_id in self.tasks[task_id].subtasks:
-                if subtask_id in self.tasks:
-                    self.unclean_task(subtask_id)
-            
-            self.save_project()
+            with self._change("unclean", self.tasks[task_id].title):
+                self._unclean_subtree(task_id)
+
+    def _unclean_subtree(self, task_id: str):
+        self._touch(task_id)
+        self.tasks[task_id].mark_unclean()
+        
+        # Mark all subtasks as unclean recursively
+        for subtask_id in self.tasks[task_id].subtasks:
+            if subtask_id in self.tasks:
+                self._unclean_subtree(subtask_id)
 
     def move_task(self, task_id: str, new_parent_id: Optional[str] = None):
         """Move a task to a new parent (None for root level)"""
@@ -393,19 +1126,187 @@ class ProjectManager:
             if parent_task.clean:
                 raise ValueError("Cannot move task to clean parent")
         
-        # Remove from current parent
-        if task.parent_id and task.parent_id in self.tasks:
-            current_parent = self.tasks[task.parent_id]
-            if task_id in current_parent.subtasks:
-                current_parent.subtasks.remove(task_id)
+        with self._change("move", task.title):
+            # The whole subtree may end up in a different shard
+            self._touch(task_id)
+            self._touch_subtree(task_id)
+            
+            # Remove from current parent
+            if task.parent_id and task.parent_id in self.tasks:
+                current_parent = self.tasks[task.parent_id]
+                if task_id in current_parent.subtasks:
+                    self._touch(current_parent.id)
+                    current_parent.subtasks.remove(task_id)
+            
+            # Add to new parent
+            if new_parent_id:
+                new_parent = self.tasks[new_parent_id]
+                self._touch(new_parent_id)
+                new_parent.add_subtask(task_id)
+                task.parent_id = new_parent_id
+            else:
+                task.parent_id = None
+            
+            task.updated_at = __import__("datetime").datetime.now().isoformat()
+
+
+    def check_integrity(self, repair: bool = False) -> List[dict]:
+        """Check the links between tasks in a single pass over the project
         
-        # Add to new parent
-        if new_parent_id:
-            new_parent = self.tasks[new_parent_id]
-            new_parent.add_subtask(task_id)
-            task.parent_id = new_parent_id
-        else:
-            task.parent_id = None
+        Returns the issues found, each a dict with "type", "task_id" and
+        "detail". With repair=True they are fixed as one undoable change:
+        parent links are the source of truth for subtask lists, orphans and
+        the task where a parent cycle was found become roots, and dangling
+        subtask, blocker and active entries are dropped.
+        """
+        issues = []
+        
+        def report(kind: str, task_id: str, detail: str):
+            issues.append({"type": kind, "task_id": task_id, "detail": detail})
+        
+        # Parent links: every chain is walked once, stopping at tasks already resolved
+        parent_of: Dict[str, Optional[str]] = {}
+        root_of: Dict[str, str] = {}
+        cycle_roots = set()
+        for start_id in self.tasks:
+            path = []
+            current_id = start_id
+            while current_id is not None and current_id not in root_of and current_id not in parent_of:
+                path.append(current_id)
+                parent_id = self.tasks[current_id].parent_id or None
+                if parent_id is not None and parent_id not in self.tasks:
+                    report("orphan", current_id, f"parent {parent_id} does not exist")
+                    parent_id = None
+                parent_of[current_id] = parent_id
+                current_id = parent_id
+            
+            if current_id is None:
+                root_id = path[-1] if path else None
+            elif current_id in root_of:
+                root_id = root_of[current_id]
+            else:
+                # Back on the path being walked: break the cycle where it was entered
+                cycle = path[path.index(current_id):]
+                report("parent_cycle", current_id, " -> ".join(cycle + [current_id]))
+                parent_of[current_id] = None
+                cycle_roots.add(current_id)
+                root_id = current_id
+            for task_id in path:
+                root_of[task_id] = root_id
+        
+        # Subtask lists must match the parent links
+        listed: Dict[str, Set[str]] = {}
+        for task in self.tasks.values():
+            seen = set()
+            for subtask_id in task.subtasks:
+                if subtask_id in seen:
+                    report("duplicate_subtask", task.id, f"lists {subtask_id} more than once")
+                elif subtask_id not in self.tasks:
+                    report("dangling_subtask", task.id, f"lists missing subtask {subtask_id}")
+                elif self.tasks[subtask_id].parent_id != task.id:
+                    owner = self.tasks[subtask_id].parent_id or "no parent"
+                    report("foreign_subtask", task.id, f"lists {subtask_id}, whose parent is {owner}")
+                seen.add(subtask_id)
+            listed[task.id] = seen
+        for task in self.tasks.values():
+            if task.parent_id in self.tasks and task.id not in listed[task.parent_id]:
+                report("unlisted_subtask", task.id, f"missing from the subtasks of {task.parent_id}")
+        
+        # Storage: one copy per task, kept in the shard of its root
+        for task_id, shard_ids in self._shard_conflicts.items():
+            if task_id in self.tasks:
+                report("duplicate_task", task_id, f"stored in shards {', '.join(sorted(shard_ids))}")
+        for task_id, root_id in root_of.items():
+            shard_id = self._shard_of.get(task_id)
+            # Touched tasks (e.g. from the legacy layout) are placed on the next save
+            if shard_id != root_id and task_id not in self._touched and root_id not in cycle_roots:
+                report("misplaced_task", task_id, f"stored in shard {shard_id}, belongs in {root_id}")
+        conflict_shards = set().union(*self._shard_conflicts.values())
+        for shard_id in self._shard_stamps:
+            if shard_id not in self._shards and shard_id not in conflict_shards:
+                report("stale_shard", shard_id, "shard file holds no tasks")
+        
+        # Blockers: existing tasks only, no duplicates and no dependency cycles
+        valid_blockers: Dict[str, List[str]] = {}
+        for task in self.tasks.values():
+            blockers = []
+            for blocker_id in task.blocked_by:
+                if blocker_id in blockers:
+                    report("duplicate_blocker", task.id, f"blocked by {blocker_id} more than once")
+                elif blocker_id == task.id:
+                    report("self_blocker", task.id, "blocked by itself")
+                elif blocker_id not in self.tasks:
+                    report("dangling_blocker", task.id, f"blocked by missing task {blocker_id}")
+                else:
+                    blockers.append(blocker_id)
+            valid_blockers[task.id] = blockers
+        
+        cut_edges = set()
+        state: Dict[str, bool] = {}  # False while on the DFS stack, True once finished
+        for start_id in self.tasks:
+            if start_id in state:
+                continue
+            state[start_id] = False
+            stack = [(start_id, iter(valid_blockers[start_id]))]
+            while stack:
+                task_id, blockers = stack[-1]
+                for blocker_id in blockers:
+                    if blocker_id not in state:
+                        state[blocker_id] = False
+                        stack.append((blocker_id, iter(valid_blockers[blocker_id])))
+                        break
+                    if not state[blocker_id]:
+                        report("dependency_cycle", task_id, f"blocked by {blocker_id}, which depends on it")
+                        cut_edges.add((task_id, blocker_id))
+                else:
+                    state[task_id] = True
+                    stack.pop()
+        
+        # Active list: existing, non-clean tasks, each listed once
+        active_tasks = []
+        active_ids = set()
+        for task_id in self.active_tasks:
+            task = self.tasks.get(task_id)
+            if task_id in active_ids:
+                report("duplicate_active", task_id, "listed as active more than once")
+            elif task is None:
+                report("missing_active", task_id, "active task does not exist")
+            elif task.clean:
+                report("clean_active", task_id, "active task is clean")
+            else:
+                active_tasks.append(task_id)
+            active_ids.add(task_id)
+        
+        if repair and issues:
+            # A full save also rewrites the shards that held stale copies, or removes them if left empty
+            with self._change("fsck", f"{len(issues)} issue(s)", full_save=True):
+                self._repair_links(parent_of, root_of, valid_blockers, cut_edges, active_tasks)
+        
+        return issues
+
+    def _repair_links(self, parent_of: Dict[str, Optional[str]], root_of: Dict[str, str],
+                      valid_blockers: Dict[str, List[str]], cut_edges: Set[tuple], active_tasks: List[str]):
+        """Apply the corrected links computed by check_integrity"""
+        # Subtask lists keep the order of their valid entries; missing children are appended
+        children: Dict[str, dict] = {task_id: {} for task_id in self.tasks}
+        for task in self.tasks.values():
+            for subtask_id in task.subtasks:
+                if subtask_id in self.tasks and parent_of[subtask_id] == task.id:
+                    children[task.id][subtask_id] = None
+        for task_id, parent_id in parent_of.items():
+            if parent_id is not None:
+                children[parent_id][task_id] = None
+        
+        for task_id, task in self.tasks.items():
+            subtasks = list(children[task_id])
+            blocked_by = [blocker_id for blocker_id in valid_blockers[task_id] if (task_id, blocker_id) not in cut_edges]
+            if (task.parent_id != parent_of[task_id] or task.subtasks != subtasks or task.blocked_by != blocked_by
+                    or self._shard_of.get(task_id) != root_of[task_id] or task_id in self._shard_conflicts):
+                self._touch(task_id)
+                task.parent_id = parent_of[task_id]
+                task.subtasks = subtasks
+                task.blocked_by = blocked_by
+        
+        self._shard_conflicts = {}
         
-        task.updated_at = __import__("datetime").datetime.now().isoformat()
-        self.save_project()
\ No newline at end of file
+        self.active_tasks = active_tasks
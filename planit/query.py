@@ -0,0 +1,311 @@
+"""Filter expressions for `planit list --where`
+
+An expression such as
+
+    completed and completed_at >= 2026-09-01 and depth <= 2 and title ~ "api"
+
+is parsed once into a tree of nodes. Each node can test a single task and,
+where the project index allows it, produce the set of candidate task ids
+up front so that only those tasks are tested.
+
+Fields: completed, clean, active, blocked (flags), title, description, id (text),
+created_at, updated_at, completed_at, cleaned_at (timestamps) and depth.
+Operators: = != < <= > >= and ~ (contains), combined with and/or/not and
+parentheses. Text comparisons ignore case. Timestamp literals must be
+prefixes of an ISO timestamp (2026-09, 2026-09-01, 2026-09-01T14:30) and
+are compared with their own precision, so `completed_at <= 2026-09-01`
+includes that day.
+"""
+import re
+from datetime import datetime
+from typing import List, Optional, Set
+
+from .task import Task
+
+FLAG_FIELDS = {"completed", "clean", "active", "blocked"}
+TEXT_FIELDS = {"title", "description", "id"}
+DATE_FIELDS = {"created_at", "updated_at", "completed_at", "cleaned_at"}
+NUMBER_FIELDS = {"depth"}
+OPERATORS = {"=", "==", "!=", "<", "<=", ">", ">=", "~"}
+
+# Prefixes of ISO timestamps: 2026, 2026-09, 2026-09-01, 2026-09-01T14:30, ...
+DATE_LITERAL_RE = re.compile(r"\d{4}(-\d{2}(-\d{2}(T\d{2}(:\d{2}(:\d{2}(\.\d{1,6})?)?)?)?)?)?")
+
+TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<op>==|!=|<=|>=|[=<>~()])
+      | (?P<word>[^\s"'=!<>~()]+)
+    )''', re.VERBOSE)
+
+
+def _date_literal(field: str, value: str) -> str:
+    literal = value.replace(" ", "T", 1)
+    if DATE_LITERAL_RE.fullmatch(literal):
+        # Complete the missing parts so that month, day and time ranges are checked too
+        template = "0001-01-01T00:00:00"
+        try:
+            datetime.fromisoformat(literal + template[len(literal):])
+            return literal
+        except ValueError:
+            pass
+    raise ValueError(f"Expected an ISO date for {field} (e.g. 2026-09-01), got '{value}'")
+
+
+def _compare(left, op: str, right) -> bool:
+    if op in ("=", "=="):
+        return left == right
+    if op == "!=":
+        return left != right
+    if op == "<":
+        return left < right
+    if op == "<=":
+        return left <= right
+    if op == ">":
+        return left > right
+    return left >= right
+
+
+class _Context:
+    """Per-query lookups shared by all nodes"""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.active = set(manager.active_tasks)
+        self._depths = {}
+
+    def depth(self, task: Task) -> int:
+        if task.id not in self._depths:
+            depth = 0
+            parent_id = task.parent_id
+            seen = {task.id}
+            while parent_id and parent_id in self.manager.tasks and parent_id not in seen:
+                seen.add(parent_id)
+                depth += 1
+                parent_id = self.manager.tasks[parent_id].parent_id
+            self._depths[task.id] = depth
+        return self._depths[task.id]
+
+
+class _And:
+    def __init__(self, children: list):
+        self.children = children
+
+    def matches(self, task: Task, context: _Context) -> bool:
+        return all(child.matches(task, context) for child in self.children)
+
+    def candidates(self, context: _Context) -> Optional[Set[str]]:
+        result = None
+        # Intersect the smallest sets first
+        for ids in sorted((ids for ids in (child.candidates(context) for child in self.children) if ids is not None), key=len):
+            result = set(ids) if result is None else result & ids
+        return result
+
+
+class _Or:
+    def __init__(self, children: list):
+        self.children = children
+
+    def matches(self, task: Task, context: _Context) -> bool:
+        return any(child.matches(task, context) for child in self.children)
+
+    def candidates(self, context: _Context) -> Optional[Set[str]]:
+        result = set()
+        for child in self.children:
+            ids = child.candidates(context)
+            if ids is None:
+                return None
+            result |= ids
+        return result
+
+
+class _Not:
+    def __init__(self, child):
+        self.child = child
+
+    def matches(self, task: Task, context: _Context) -> bool:
+        return not self.child.matches(task, context)
+
+    def candidates(self, context: _Context) -> Optional[Set[str]]:
+        return None
+
+
+class _Comparison:
+    def __init__(self, field: str, op: str, value: str):
+        self.field = field
+        self.op = op
+        
+        if field in FLAG_FIELDS:
+            if op not in ("=", "==", "!="):
+                raise ValueError(f"Operator '{op}' cannot be used with {field}")
+            if value.lower() not in ("true", "false"):
+                raise ValueError(f"Expected true or false for {field}, got '{value}'")
+            self.value = value.lower() == "true"
+        elif field in NUMBER_FIELDS:
+            if op == "~":
+                raise ValueError(f"Operator '~' cannot be used with {field}")
+            try:
+                self.value = int(value)
+            except ValueError:
+                raise ValueError(f"Expected a number for {field}, got '{value}'")
+        elif field in DATE_FIELDS:
+            if op == "~":
+                raise ValueError(f"Operator '~' cannot be used with {field}")
+            self.value = _date_literal(field, value)
+        else:
+            self.value = value.lower()
+
+    def _flag(self, task: Task, context: _Context) -> bool:
+        if self.field == "active":
+            return task.id in context.active
+        if self.field == "blocked":
+            return task.id in context.manager.index.blocked
+        return getattr(task, self.field)
+
+    def matches(self, task: Task, context: _Context) -> bool:
+        if self.field in FLAG_FIELDS:
+            return _compare(self._flag(task, context), self.op, self.value)
+        if self.field in NUMBER_FIELDS:
+            return _compare(context.depth(task), self.op, self.value)
+        
+        field_value = getattr(task, self.field)
+        if field_value is None:
+            return self.op == "!="
+        if self.field in DATE_FIELDS:
+            # Compare at the precision of the literal (e.g. whole days)
+            return _compare(field_value[:len(self.value)], self.op, self.value)
+        
+        field_value = field_value.lower()
+        if self.op == "~":
+            return self.value in field_value
+        return _compare(field_value, self.op, self.value)
+
+    def candidates(self, context: _Context) -> Optional[Set[str]]:
+        index = context.manager.index
+        if self.field in FLAG_FIELDS and self.value == (self.op != "!="):
+            if self.field == "active":
+                return context.active
+            return getattr(index, self.field)
+        if self.field in index.timestamps:
+            return index.find_by_time(self.field, self.op, self.value)
+        if self.field == "title":
+            if self.op in ("=", "=="):
+                return index.find_by_title(self.value)
+            if self.op == "~":
+                return index.search_titles(self.value)
+        return None
+
+
+class _Parser:
+    def __init__(self, expression: str):
+        self.tokens = self._tokenize(expression)
+        self.position = 0
+
+    @staticmethod
+    def _tokenize(expression: str) -> List[tuple]:
+        tokens = []
+        position = 0
+        expression = expression.rstrip()
+        while position < len(expression):
+            match = TOKEN_RE.match(expression, position)
+            if not match:
+                raise ValueError(f"Invalid filter expression near '{expression[position:].strip()}'")
+            position = match.end()
+            if match.group("string") is not None:
+                text = match.group("string")[1:-1]
+                tokens.append(("value", re.sub(r"\\(.)", r"\1", text)))
+            elif match.group("op") is not None:
+                tokens.append(("op", match.group("op")))
+            else:
+                tokens.append(("word", match.group("word")))
+        return tokens
+
+    def _peek(self) -> Optional[tuple]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _next(self) -> tuple:
+        token = self._peek()
+        if token is None:
+            raise ValueError("Unexpected end of filter expression")
+        self.position += 1
+        return token
+
+    def _accept_word(self, word: str) -> bool:
+        token = self._peek()
+        if token and token[0] == "word" and token[1].lower() == word:
+            self.position += 1
+            return True
+        return False
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError("Empty filter expression")
+        node = self._parse_or()
+        if self._peek() is not None:
+            raise ValueError(f"Unexpected '{self._peek()[1]}' in filter expression")
+        return node
+
+    def _parse_or(self):
+        children = [self._parse_and()]
+        while self._accept_word("or"):
+            children.append(self._parse_and())
+        return children[0] if len(children) == 1 else _Or(children)
+
+    def _parse_and(self):
+        children = [self._parse_not()]
+        while self._accept_word("and"):
+            children.append(self._parse_not())
+        return children[0] if len(children) == 1 else _And(children)
+
+    def _parse_not(self):
+        if self._accept_word("not"):
+            return _Not(self._parse_not())
+        return self._parse_atom()
+
+    def _parse_atom(self):
+        kind, text = self._next()
+        if (kind, text) == ("op", "("):
+            node = self._parse_or()
+            if self._next() != ("op", ")"):
+                raise ValueError("Missing ')' in filter expression")
+            return node
+        
+        field = text.lower()
+        if kind != "word" or field not in FLAG_FIELDS | TEXT_FIELDS | DATE_FIELDS | NUMBER_FIELDS:
+            raise ValueError(f"Unknown field '{text}' in filter expression")
+        
+        token = self._peek()
+        if token is None or token[0] != "op" or token[1] not in OPERATORS:
+            if field in FLAG_FIELDS:
+                return _Comparison(field, "=", "true")
+            raise ValueError(f"Expected an operator after '{text}'")
+        
+        self.position += 1
+        kind, value = self._next()
+        if kind == "op":
+            raise ValueError(f"Expected a value after '{text} {token[1]}'")
+        return _Comparison(field, token[1], value)
+
+
+class Query:
+    """A compiled filter expression"""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self._root = _Parser(expression).parse()
+
+    def select(self, manager) -> Set[str]:
+        """Ids of the tasks that match, testing only the indexed candidates"""
+        context = _Context(manager)
+        candidate_ids = self._root.candidates(context)
+        if candidate_ids is None:
+            candidate_ids = manager.tasks.keys()
+        
+        return {
+            task_id for task_id in candidate_ids
+            if task_id in manager.tasks and self._root.matches(manager.tasks[task_id], context)
+        }
+
+
+def compile_query(expression: str) -> Query:
+    return Query(expression)
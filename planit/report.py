@@ -0,0 +1,85 @@
+"""Activity and cycle-time reports answered from the timestamp index"""
+from datetime import date, datetime
+from statistics import median
+from typing import Dict, List, Optional
+
+from .index import TIMESTAMP_FIELDS
+
+PERIODS = ("day", "week")
+
+
+def _period_key(day: str, by: str, cache: Dict[str, str]) -> str:
+    """Bucket label for a YYYY-MM-DD day: the day itself or its ISO week"""
+    if by == "day":
+        return day
+    if day not in cache:
+        year, week, _ = date.fromisoformat(day).isocalendar()
+        cache[day] = f"{year}-W{week:02d}"
+    return cache[day]
+
+
+def parse_day(value: str) -> str:
+    """Validate a YYYY-MM-DD day and return it in normalized ISO form"""
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD") from None
+
+
+def build_report(manager, since: Optional[str] = None, until: Optional[str] = None, by: str = "day") -> dict:
+    """Count created/completed/cleaned tasks per period and cycle times per root subtree
+
+    Only the index entries inside [since, until] are visited, so the cost
+    depends on the activity in the window rather than on the project size.
+    Returns {"periods": [(period, {field: count})], "totals": {field: count},
+    "cycle_times": [(root_task, [seconds, ...])]}.
+    """
+    if by not in PERIODS:
+        raise ValueError(f"Unknown period '{by}', expected one of: {', '.join(PERIODS)}")
+    # Bounds are compared as strings against ISO timestamps, so they must be ISO days
+    since = parse_day(since) if since else None
+    until = parse_day(until) if until else None
+    
+    counts: Dict[str, Dict[str, int]] = {}
+    totals = {field: 0 for field in TIMESTAMP_FIELDS}
+    week_cache: Dict[str, str] = {}
+    
+    for field in TIMESTAMP_FIELDS:
+        for timestamp, _ in manager.index.time_range(field, since, until):
+            period = _period_key(timestamp[:10], by, week_cache)
+            period_counts = counts.setdefault(period, {name: 0 for name in TIMESTAMP_FIELDS})
+            period_counts[field] += 1
+            totals[field] += 1
+    
+    # Cycle time: from creation to completion, for tasks completed in the window
+    cycle_times: Dict[str, List[float]] = {}
+    for completed_at, task_id in manager.index.time_range("completed_at", since, until):
+        task = manager.tasks[task_id]
+        try:
+            seconds = (datetime.fromisoformat(completed_at) - datetime.fromisoformat(task.created_at)).total_seconds()
+        except ValueError:
+            continue
+        cycle_times.setdefault(manager.get_root_id(task_id), []).append(max(seconds, 0.0))
+    
+    return {
+        "periods": sorted(counts.items()),
+        "totals": totals,
+        "cycle_times": sorted(
+            ((manager.tasks[root_id], durations) for root_id, durations in cycle_times.items()),
+            key=lambda item: item[0].title.lower()
+        )
+    }
+
+
+def format_duration(seconds: float) -> str:
+    """Short human-readable duration such as 45m, 3.5h or 2.1d"""
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 86400:.1f}d"
+
+
+def summarize_durations(durations: List[float]) -> tuple:
+    """(count, average, median) of a list of durations in seconds"""
+    return len(durations), sum(durations) / len(durations), median(durations)
@@ -11,6 +11,7 @@ class Task:
         self.description = description
         self.parent_id = parent_id
         self.subtasks: List[str] = []
+        self.blocked_by: List[str] = []
         self.created_at = datetime.now().isoformat()
         self.updated_at = datetime.now().isoformat()
         self.completed = False
@@ -51,6 +52,7 @@ class Task:
             "description": self.description,
             "parent_id": self.parent_id,
             "subtasks": self.subtasks,
+            "blocked_by": self.blocked_by,
             "created_at": self.created_at,
             "updated_at": self.updated_at,
             "completed": self.completed,
@@ -69,6 +71,7 @@ class Task:
         task = cls(data["title"], data.get("description", ""), data.get("parent_id"))
         task.id = data["id"]
         task.subtasks = data.get("subtasks", [])
+        task.blocked_by = data.get("blocked_by", [])
         
         # Handle missing timestamps with minimum Linux date
         min_date = cls._get_min_linux_date()
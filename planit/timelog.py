@@ -0,0 +1,92 @@
+"""Append-only log of task activations, used to report time spent per task
+
+Each line is "<unix time> <+|-> <task id>": + when a task is taken and -
+when it is released (untaken, completed, cleaned or deleted). Totals over
+the whole log are cached together with the byte offset they cover, so a
+repeated report only reads the lines appended since.
+"""
+import json
+import os
+import time
+from typing import Dict, Iterable, Optional
+
+
+def append_events(log_file: str, started: Iterable[str], stopped: Iterable[str], at: Optional[int] = None):
+    """Record tasks that became active (started) or inactive (stopped)"""
+    at = int(time.time()) if at is None else at
+    lines = [f"{at} - {task_id}\n" for task_id in stopped] + [f"{at} + {task_id}\n" for task_id in started]
+    if lines:
+        with open(log_file, 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+
+
+def _scan(lines: Iterable[str], totals: Dict[str, int], open_intervals: Dict[str, int], since: Optional[int] = None):
+    """Add the closed intervals found in lines to totals, clipped to start at since"""
+    for line in lines:
+        parts = line.split()
+        if len(parts) != 3 or not parts[0].isdigit():
+            continue
+        
+        at, event, task_id = int(parts[0]), parts[1], parts[2]
+        if event == "+":
+            open_intervals.setdefault(task_id, at)
+        elif event == "-" and task_id in open_intervals:
+            start = open_intervals.pop(task_id)
+            if since is not None:
+                start = max(start, since)
+            if at > start:
+                totals[task_id] = totals.get(task_id, 0) + at - start
+
+
+def _load_cache(cache_file: str) -> dict:
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        return {"offset": cache["offset"], "totals": cache["totals"], "open": cache["open"]}
+    except (OSError, ValueError, KeyError):
+        return {"offset": 0, "totals": {}, "open": {}}
+
+
+def load_totals(log_file: str, cache_file: str, since: Optional[int] = None, now: Optional[int] = None) -> Dict[str, int]:
+    """Seconds each task has been active, optionally only counting time after since
+
+    Intervals that are still open are counted up to now.
+    """
+    now = int(time.time()) if now is None else now
+    if not os.path.exists(log_file):
+        return {}
+    
+    if since is None:
+        cache = _load_cache(cache_file)
+        if os.path.getsize(log_file) < cache["offset"]:
+            # The log was truncated or replaced: start over
+            cache = {"offset": 0, "totals": {}, "open": {}}
+        
+        with open(log_file, 'rb') as f:
+            f.seek(cache["offset"])
+            data = f.read()
+        # Leave a partially written last line for the next read
+        complete = data[:data.rfind(b"\n") + 1]
+        if complete:
+            _scan(complete.decode('utf-8').splitlines(), cache["totals"], cache["open"])
+            cache["offset"] += len(complete)
+            try:
+                with open(f"{cache_file}.tmp", 'w', encoding='utf-8') as f:
+                    json.dump(cache, f)
+                os.replace(f"{cache_file}.tmp", cache_file)
+            except OSError:
+                pass
+        
+        totals, open_intervals = dict(cache["totals"]), cache["open"]
+    else:
+        totals, open_intervals = {}, {}
+        with open(log_file, 'r', encoding='utf-8') as f:
+            _scan(f, totals, open_intervals, since)
+    
+    for task_id, start in open_intervals.items():
+        if since is not None:
+            start = max(start, since)
+        if now > start:
+            totals[task_id] = totals.get(task_id, 0) + now - start
+    
+    return totals
@@ -0,0 +1,79 @@
+"""Wait for project changes and compute what changed between two views"""
+import ctypes
+import ctypes.util
+import os
+import select
+import time
+from typing import Dict, List, Optional, Tuple
+
+# inotify event masks from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+
+
+class ChangeWaiter:
+    """Sleep until a directory changes or the timeout expires
+
+    Uses inotify through ctypes when the platform provides it, so the
+    watcher wakes up as soon as the project is saved; otherwise it just
+    sleeps and the caller falls back to polling file stamps.
+    """
+
+    def __init__(self, directory: str):
+        self.fd: Optional[int] = None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+        if fd < 0:
+            return
+        
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+            os.close(fd)
+            return
+        self.fd = fd
+
+    def wait(self, timeout: float):
+        if self.fd is None:
+            time.sleep(timeout)
+            return
+        
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if readable:
+            # Drain pending events; only the fact that something changed matters
+            try:
+                while os.read(self.fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def diff_rows(old_rows: Dict[str, dict], new_rows: Dict[str, dict]) -> List[Tuple[str, dict]]:
+    """Compare two {task_id: row} views and return (event, row) pairs
+
+    Events are "added", "removed" and "changed", in the order of the new view
+    followed by the removed rows.
+    """
+    changes = []
+    for task_id, row in new_rows.items():
+        old_row = old_rows.get(task_id)
+        if old_row is None:
+            changes.append(("added", row))
+        elif old_row != row:
+            changes.append(("changed", row))
+    
+    for task_id, row in old_rows.items():
+        if task_id not in new_rows:
+            changes.append(("removed", row))
+    
+    return changes
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from planit.project_manager import ProjectManager
+
+
+class BatchRollbackTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.manager = ProjectManager(self.tmp.name)
+        self.manager.initialize_project()
+        self.a = self.manager.create_task("A")
+        self.b = self.manager.create_task("B")
+        self.c = self.manager.create_task("C")
+        self.manager.clean_task(self.c)
+
+    def run_failing_batch(self):
+        with self.assertRaises(ValueError):
+            with self.manager.batch("take"):
+                self.manager.add_active_task(self.a)
+                self.manager.complete_task(self.b)
+                self.manager.create_task("Created in batch")
+                # Clean tasks cannot be taken: the batch fails halfway
+                self.manager.add_active_task(self.c)
+
+    def test_failed_batch_restores_memory(self):
+        history_before = self.manager.load_history()
+        self.run_failing_batch()
+        
+        self.assertEqual(self.manager.active_tasks, [])
+        self.assertFalse(self.manager.tasks[self.b].completed)
+        self.assertEqual(len(self.manager.tasks), 3)
+        self.assertEqual(self.manager.load_history(), history_before)
+
+    def test_failed_batch_is_not_saved_by_later_changes(self):
+        self.run_failing_batch()
+        self.manager.create_task("D")
+        
+        reloaded = ProjectManager(self.tmp.name)
+        reloaded.load_project()
+        self.assertEqual(reloaded.active_tasks, [])
+        self.assertFalse(reloaded.tasks[self.b].completed)
+        self.assertEqual(sorted(task.title for task in reloaded.tasks.values()), ["A", "B", "C", "D"])
+        self.assertEqual(reloaded.check_integrity(), [])
+        self.assertFalse(os.path.exists(reloaded.time_log_file))
+
+    def test_undo_after_failed_batch_reverts_previous_change(self):
+        self.run_failing_batch()
+        entry = self.manager.undo()
+        
+        self.assertEqual(entry["command"], "clean")
+        self.assertFalse(self.manager.tasks[self.c].clean)
+
+
+if __name__ == "__main__":
+    unittest.main()